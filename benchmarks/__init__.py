@@ -0,0 +1 @@
+"""Engine hot path benchmarks, see benchmarks.run."""
@@ -0,0 +1,288 @@
+"""
+Benchmarks for the engine hot paths, run headless on SDL's dummy drivers
+with the sprites from the local assets directory:
+
+    python -m benchmarks.run [--output latest.json] [--baseline base.json]
+
+Each benchmark reports per-call times in microseconds. With a baseline,
+any benchmark whose fastest round got slower by more than --threshold is
+flagged and the run exits with status 1. The fastest round is compared
+because it is the least disturbed by whatever else the machine is doing.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict
+
+# before pygame is imported anywhere
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from src.entities import (  # noqa: E402
+    Background,
+    Floor,
+    Pipes,
+    Player,
+    PlayerMode,
+    Score,
+)
+from src.utils import (  # noqa: E402
+    GameConfig,
+    Hud,
+    Images,
+    Sounds,
+    Window,
+    get_font,
+    get_hit_mask,
+    pixel_collision,
+)
+from src.utils.constants import ASSETS_DIR  # noqa: E402
+from src.utils.sprite_bundle import get_bundle  # noqa: E402
+from src.utils.utils import build_hit_mask  # noqa: E402
+
+BENCHMARKS: Dict[str, Callable[[GameConfig], Callable[[], None]]] = {}
+
+
+def benchmark(func):
+    """registers a setup function that returns the callable to time"""
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def make_config() -> GameConfig:
+    pygame.init()
+    window = Window(288, 512)
+    screen = pygame.display.set_mode((window.width, window.height))
+    return GameConfig(
+        screen=screen,
+        clock=pygame.time.Clock(),
+        fps=30,
+        window=window,
+        images=Images(ASSETS_DIR),
+        sounds=Sounds(enabled=False),
+    )
+
+
+def autopilot(player: Player, pipes: Pipes) -> bool:
+    """flaps to stay in the next gap, keeps long runs in play mode"""
+    for lower in pipes.lower:
+        if lower.x + lower.w > player.x:
+            return player.y + player.h > lower.y - 12 and player.vel_y >= 0
+    return player.y > 200
+
+
+@benchmark
+def build_hit_mask_cold(config: GameConfig):
+    image = config.images.pipe[1]
+    return lambda: build_hit_mask(image)
+
+
+@benchmark
+def get_hit_mask_cached(config: GameConfig):
+    image = config.images.pipe[1]
+    get_hit_mask(image)
+    return lambda: get_hit_mask(image)
+
+
+@benchmark
+def pixel_collision_hit(config: GameConfig):
+    player, pipe = config.images.player[0], config.images.pipe[1]
+    rect1 = player.get_rect(topleft=(100, 300))
+    rect2 = pipe.get_rect(topleft=(110, 310))
+    mask1, mask2 = get_hit_mask(player), get_hit_mask(pipe)
+    return lambda: pixel_collision(rect1, rect2, mask1, mask2)
+
+
+@benchmark
+def pixel_collision_near_miss(config: GameConfig):
+    # rects overlap but the pixels don't, the most expensive miss
+    player, pipe = config.images.player[0], config.images.pipe[1]
+    rect2 = pipe.get_rect(topleft=(100, 300))
+    rect1 = player.get_rect(bottomright=(rect2.left + 2, rect2.top + 2))
+    mask1, mask2 = get_hit_mask(player), get_hit_mask(pipe)
+    return lambda: pixel_collision(rect1, rect2, mask1, mask2)
+
+
+@benchmark
+def player_collided(config: GameConfig):
+    player, pipes, floor = Player(config), Pipes(config), Floor(config)
+    player.set_mode(PlayerMode.NORMAL)
+    # a pipe pair right on the player, passing through the gap
+    pipes.upper[0].x = pipes.lower[0].x = player.x - 10
+    player.y = pipes.lower[0].y - pipes.pipe_gap / 2
+    return lambda: player.collided(pipes, floor)
+
+
+@benchmark
+def pipes_tick(config: GameConfig):
+    pipes = Pipes(config)
+
+    def tick():
+        pipes.tick()
+        # nothing presents these, don't let the dirty rects pile up
+        config.renderer.dirty.clear()
+
+    return tick
+
+
+@benchmark
+def player_draw_player(config: GameConfig):
+    player = Player(config)
+    player.set_mode(PlayerMode.NORMAL)
+    angles = iter(range(10**9))
+
+    def draw():
+        # sweep the whole rotation range like a falling bird does
+        player.rot = 20 - next(angles) % 111
+        player.draw_player()
+        config.renderer.dirty.clear()
+
+    return draw
+
+
+@benchmark
+def play_frame(config: GameConfig):
+    """one Flappy.play iteration without the clock's sleep"""
+    hud = Hud(config.renderer, get_font("Arial", 20))
+    background = Background(config)
+    state = {}
+
+    def new_game():
+        state["floor"] = Floor(config)
+        state["player"] = Player(config)
+        state["pipes"] = Pipes(config)
+        state["score"] = Score(config)
+        state["player"].set_mode(PlayerMode.NORMAL)
+
+    new_game()
+
+    def frame():
+        floor, player = state["floor"], state["player"]
+        pipes, score = state["pipes"], state["score"]
+        if player.collided(pipes, floor):
+            new_game()
+            return
+        cx = player.cx
+        for pipe, _ in pipes.overlapping(cx, cx):
+            if player.crossed(pipe):
+                score.add()
+        pygame.event.pump()
+        if autopilot(player, pipes):
+            player.flap()
+        for entity in (background, floor, pipes, score, player):
+            entity.tick()
+        hud.set("fps", f"FPS: {int(config.clock.get_fps())}", (5, 5))
+        hud.set("name", "Player: bench", (5, 25))
+        hud.draw()
+        config.renderer.present()
+
+    return frame
+
+
+def measure(func: Callable[[], None], repeat: int, min_time: float) -> dict:
+    """per-call times in us over `repeat` rounds of at least min_time s"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10:
+            break
+        loops *= 2
+    loops = max(1, int(loops * min_time / elapsed))
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        times.append((time.perf_counter() - start) / loops * 1e6)
+    return {
+        "median_us": statistics.median(times),
+        "min_us": min(times),
+        "max_us": max(times),
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """names of benchmarks whose fastest round regressed past threshold"""
+    regressions = []
+    for name, result in results["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<28}{'new':>12}")
+            continue
+        change = result["min_us"] / base["min_us"] - 1
+        flag = "REGRESSED" if change > threshold else ""
+        print(f"{name:<28}{change:>+11.1%} {flag}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", "-o", help="write results JSON here")
+    parser.add_argument("--baseline", "-b", help="results JSON to compare to")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="slowdown that counts as a regression (default 0.10)",
+    )
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("names", nargs="*", help="only run these")
+    args = parser.parse_args()
+
+    config = make_config()
+    results = {
+        "meta": {
+            "time": time.time(),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": platform.machine(),
+            "sprite_bundle": get_bundle() is not None,
+        },
+        "results": {},
+    }
+    for name, setup in BENCHMARKS.items():
+        if args.names and name not in args.names:
+            continue
+        result = measure(setup(config), args.repeat, args.min_time)
+        results["results"][name] = result
+        print(
+            f"{name:<28}{result['median_us']:>10.2f} us"
+            f"  (min {result['min_us']:.2f}, {result['loops']} loops)"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}, nothing to compare")
+            return 0
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nAgainst {args.baseline}:")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressed: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
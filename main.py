@@ -1,6 +1,26 @@
-import asyncio
+import time
 
-from src.flappy import Flappy
+# taken before the game's imports, for the time to first frame
+STARTED = time.perf_counter()
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+
+from src.flappy import Flappy  # noqa: E402
+from src.utils.profiler import FrameProfiler  # noqa: E402
 
 if __name__ == "__main__":
-    asyncio.run(Flappy().start())
+    parser = argparse.ArgumentParser(description="Flappy Bird")
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="time each phase of every frame and write a Chrome trace to PATH",
+    )
+    args = parser.parse_args()
+
+    profiler = FrameProfiler(args.profile) if args.profile else None
+    try:
+        asyncio.run(Flappy(profiler, STARTED).start())
+    finally:
+        if profiler is not None:
+            profiler.close()
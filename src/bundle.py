@@ -0,0 +1,8 @@
+"""Builds the packed sprite bundle, see src.utils.sprite_bundle."""
+
+import sys
+
+from .utils.sprite_bundle import build_bundle
+
+if __name__ == "__main__":
+    build_bundle(*sys.argv[1:2])
@@ -12,3 +12,7 @@ class Background(Entity):
             config.window.width,
             config.window.height,
         )
+
+    def draw(self) -> None:
+        # Cached by the renderer, only repainted where something moved
+        self.config.renderer.draw_background(self.image)
@@ -1,11 +1,20 @@
-from typing import Optional
+from typing import Optional, Tuple
 
 import pygame
 
-from ..utils import GameConfig, get_hit_mask, pixel_collision
+from ..utils import (
+    GameConfig,
+    get_font,
+    get_hit_mask,
+    get_text_cache,
+    pixel_collision,
+)
 
 
 class Entity:
+    # drawn between the last two physics steps, see render
+    interpolate = False
+
     def __init__(
         self,
         config: GameConfig,
@@ -19,6 +28,8 @@ class Entity:
         self.config = config
         self.x = x
         self.y = y
+        self.prev_x = x
+        self.prev_y = y
         if w or h:
             self.w = w or config.window.ratio * h
             self.h = h or w / config.window.ratio
@@ -52,32 +63,68 @@ class Entity:
         return pygame.Rect(self.x, self.y, self.w, self.h)
 
     def collide(self, other) -> bool:
-        if not self.hit_mask or not other.hit_mask:
+        if self.hit_mask is None or other.hit_mask is None:
             return self.rect.colliderect(other.rect)
         return pixel_collision(
             self.rect, other.rect, self.hit_mask, other.hit_mask
         )
 
+    def update(self) -> None:
+        """advances the entity by one frame without drawing anything"""
+        pass
+
+    def step(self) -> None:
+        """one fixed physics step, remembering where it started"""
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.update()
+
     def tick(self) -> None:
+        self.update()
+        if self.config.screen is not None:
+            self.render()
+
+    def lerp(self, alpha: float) -> Tuple[float, float]:
+        """position `alpha` of the way from the previous step to this one"""
+        return (
+            self.prev_x + (self.x - self.prev_x) * alpha,
+            self.prev_y + (self.y - self.prev_y) * alpha,
+        )
+
+    def render(self, alpha: float = 1) -> None:
+        if self.interpolate and alpha < 1:
+            # draw at the in-between position, physics keeps the real one
+            x, y = self.x, self.y
+            self.x, self.y = self.lerp(alpha)
+            try:
+                self.render()
+            finally:
+                self.x, self.y = x, y
+            return
+
         self.draw()
-        rect = self.rect
         if self.config.debug:
+            self.draw_debug()
+
+    def draw_debug(self) -> None:
+        rect = self.rect
+        self.config.renderer.mark(
             pygame.draw.rect(self.config.screen, (255, 0, 0), rect, 1)
-            # write x and y at top of rect
-            font = pygame.font.SysFont("Arial", 13, True)
-            text = font.render(
-                f"{self.x:.1f}, {self.y:.1f}, {self.w:.1f}, {self.h:.1f}",
-                True,
-                (255, 255, 255),
-            )
-            self.config.screen.blit(
-                text,
-                (
-                    rect.x + rect.w / 2 - text.get_width() / 2,
-                    rect.y - text.get_height(),
-                ),
-            )
+        )
+        # write x and y at top of rect
+        text = get_text_cache().render(
+            get_font("Arial", 13, True),
+            f"{self.x:.1f}, {self.y:.1f}, {self.w:.1f}, {self.h:.1f}",
+            (255, 255, 255),
+        )
+        self.config.renderer.blit(
+            text,
+            (
+                rect.x + rect.w / 2 - text.get_width() / 2,
+                rect.y - text.get_height(),
+            ),
+        )
 
     def draw(self) -> None:
         if self.image:
-            self.config.screen.blit(self.image, self.rect)
+            self.config.renderer.blit(self.image, self.rect)
@@ -1,8 +1,12 @@
+from typing import Tuple
+
 from ..utils import GameConfig
 from .entity import Entity
 
 
 class Floor(Entity):
+    interpolate = True
+
     def __init__(self, config: GameConfig) -> None:
         super().__init__(config, config.images.base, 0, config.window.vh)
         self.vel_x = 4
@@ -11,6 +15,12 @@ class Floor(Entity):
     def stop(self) -> None:
         self.vel_x = 0
 
-    def draw(self) -> None:
+    def update(self) -> None:
         self.x = -((-self.x + self.vel_x) % self.x_extra)
-        super().draw()
+
+    def lerp(self, alpha: float) -> Tuple[float, float]:
+        x = self.x
+        if x > self.prev_x:
+            # wrapped around, keep scrolling left to the same-looking spot
+            x -= self.x_extra
+        return self.prev_x + (x - self.prev_x) * alpha, self.y
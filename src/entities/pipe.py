@@ -1,44 +1,100 @@
 import random
-from typing import List
+from collections import deque
+from itertools import chain
+from typing import Deque, Iterator, List, Optional, Tuple
+
+import pygame
 
 from ..utils import GameConfig
 from .entity import Entity
 
 
 class Pipe(Entity):
+    interpolate = True
+
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self.vel_x = -5
 
-    def draw(self) -> None:
+    def recycle(self, image: pygame.Surface, x: float, y: float) -> None:
+        """puts a pipe that left the screen back in play"""
+        if image is not self.image:
+            self.update_image(image)
+        self.x = self.prev_x = x
+        self.y = self.prev_y = y
+        self.vel_x = -5
+
+    def update(self) -> None:
         self.x += self.vel_x
-        super().draw()
 
 
 class Pipes(Entity):
-    upper: List[Pipe]
-    lower: List[Pipe]
+    upper: Deque[Pipe]
+    lower: Deque[Pipe]
 
-    def __init__(self, config: GameConfig) -> None:
+    def __init__(
+        self, config: GameConfig, rng: Optional[random.Random] = None
+    ) -> None:
         super().__init__(config)
+        # gap positions come from a per-session generator, so a seeded game
+        # can be replayed, see Recording
+        self.rng = rng or random.Random()
         self.pipe_gap = 120
         self.top = 0
         self.bottom = self.config.window.viewport_height
-        self.upper = []
-        self.lower = []
+        # pipes on screen in spawn order, oldest on the left
+        self.upper = deque()
+        self.lower = deque()
+        # pipes that left the screen, reused by the next spawns so a long
+        # game settles on a fixed set of Pipe objects
+        self.free_upper: List[Pipe] = []
+        self.free_lower: List[Pipe] = []
+        self.spawn_initial_pipes()
+
+    def reset(self, rng: Optional[random.Random] = None) -> None:
+        """starts over with new initial pipes, reusing the current ones"""
+        if rng is not None:
+            self.rng = rng
+        self.free_upper.extend(self.upper)
+        self.free_lower.extend(self.lower)
+        self.upper.clear()
+        self.lower.clear()
         self.spawn_initial_pipes()
 
-    def tick(self) -> None:
+    def update(self) -> None:
         if self.can_spawn_pipes():
             self.spawn_new_pipes()
         self.remove_old_pipes()
 
         for up_pipe, low_pipe in zip(self.upper, self.lower):
-            up_pipe.tick()
-            low_pipe.tick()
+            up_pipe.step()
+            low_pipe.step()
+
+    def render(self, alpha: float = 1) -> None:
+        for up_pipe, low_pipe in zip(self.upper, self.lower):
+            up_pipe.render(alpha)
+            low_pipe.render(alpha)
+
+    def overlapping(
+        self, left: float, right: float
+    ) -> Iterator[Tuple[Pipe, Pipe]]:
+        """
+        yields the (upper, lower) pairs whose x-range swept during the last
+        frame touches [left, right]. pairs are spawned on the right and
+        removed on the left at one shared speed, so the lists stay sorted by
+        x and the scan stops at the first pair past `right`.
+        """
+        for up_pipe, low_pipe in zip(self.upper, self.lower):
+            # sweep back over this frame's movement so fast scrolling can't
+            # skip a pipe that moved clean past the range in one step
+            prev_x = up_pipe.x - up_pipe.vel_x
+            if min(up_pipe.x, prev_x) > right:
+                break
+            if max(up_pipe.x, prev_x) + up_pipe.w >= left:
+                yield up_pipe, low_pipe
 
     def stop(self) -> None:
-        for pipe in self.upper + self.lower:
+        for pipe in chain(self.upper, self.lower):
             pipe.vel_x = 0
 
     def can_spawn_pipes(self) -> bool:
@@ -55,50 +111,53 @@ class Pipes(Entity):
         self.lower.append(lower)
 
     def remove_old_pipes(self):
-        # remove first pipe if its out of the screen
-        for pipe in self.upper:
-            if pipe.x < -pipe.w:
-                self.upper.remove(pipe)
-
-        for pipe in self.lower:
-            if pipe.x < -pipe.w:
-                self.lower.remove(pipe)
+        # pipes leave on the left in spawn order, so only the oldest can be
+        # out of the screen
+        while self.upper and self.upper[0].x < -self.upper[0].w:
+            self.free_upper.append(self.upper.popleft())
+            self.free_lower.append(self.lower.popleft())
 
     def spawn_initial_pipes(self):
-        upper_1, lower_1 = self.make_random_pipes()
-        upper_1.x = self.config.window.width + upper_1.w * 3
-        lower_1.x = self.config.window.width + upper_1.w * 3
-        self.upper.append(upper_1)
-        self.lower.append(lower_1)
-
-        upper_2, lower_2 = self.make_random_pipes()
-        upper_2.x = upper_1.x + upper_1.w * 3.5
-        lower_2.x = upper_1.x + upper_1.w * 3.5
-        self.upper.append(upper_2)
-        self.lower.append(lower_2)
-
-    def make_random_pipes(self):
-        """returns a randomly generated pipe"""
+        pipe_w = self.config.images.pipe[0].get_width()
+        x = self.config.window.width + pipe_w * 3
+        for pipe_x in (x, x + pipe_w * 3.5):
+            upper, lower = self.make_random_pipes(pipe_x)
+            self.upper.append(upper)
+            self.lower.append(lower)
+
+    def make_random_pipes(self, pipe_x: Optional[float] = None):
+        """returns a randomly generated pipe, just off screen by default"""
         # y of gap between upper and lower pipe
         base_y = self.config.window.viewport_height
 
-        gap_y = random.randrange(0, int(base_y * 0.6 - self.pipe_gap))
+        gap_y = self.rng.randrange(0, int(base_y * 0.6 - self.pipe_gap))
         gap_y += int(base_y * 0.2)
         pipe_height = self.config.images.pipe[0].get_height()
-        pipe_x = self.config.window.width + 10
+        if pipe_x is None:
+            pipe_x = self.config.window.width + 10
 
-        upper_pipe = Pipe(
-            self.config,
+        upper_pipe = self.take_pipe(
+            self.free_upper,
             self.config.images.pipe[0],
             pipe_x,
             gap_y - pipe_height,
         )
 
-        lower_pipe = Pipe(
-            self.config,
+        lower_pipe = self.take_pipe(
+            self.free_lower,
             self.config.images.pipe[1],
             pipe_x,
             gap_y + self.pipe_gap,
         )
 
         return upper_pipe, lower_pipe
+
+    def take_pipe(
+        self, free: List[Pipe], image: pygame.Surface, x: float, y: float
+    ) -> Pipe:
+        """returns a recycled pipe, or a new one if none is free"""
+        if free:
+            pipe = free.pop()
+            pipe.recycle(image, x, y)
+            return pipe
+        return Pipe(self.config, image, x, y)
@@ -3,7 +3,7 @@ from itertools import cycle
 
 import pygame
 
-from ..utils import GameConfig, clamp
+from ..utils import GameConfig, clamp, get_rotation_atlas
 from .entity import Entity
 from .floor import Floor
 from .pipe import Pipe, Pipes
@@ -16,6 +16,8 @@ class PlayerMode(Enum):
 
 
 class Player(Entity):
+    interpolate = True
+
     def __init__(self, config: GameConfig) -> None:
         image = config.images.player[0]
         x = int(config.window.width * 0.2)
@@ -28,20 +30,21 @@ class Player(Entity):
         self.frame = 0
         self.crashed = False
         self.crash_entity = None
+        self.atlas = get_rotation_atlas(config.images.player)
         self.set_mode(PlayerMode.SHM)
 
     def set_mode(self, mode: PlayerMode) -> None:
         self.mode = mode
         if mode == PlayerMode.NORMAL:
             self.reset_vals_normal()
-            self.config.sounds.wing.play()
+            self.config.sounds.play_sound(self.config.sounds.wing)
         elif mode == PlayerMode.SHM:
             self.reset_vals_shm()
         elif mode == PlayerMode.CRASH:
             self.stop_wings()
-            self.config.sounds.hit.play()
+            self.config.sounds.play_sound(self.config.sounds.hit)
             if self.crash_entity == "pipe":
-                self.config.sounds.die.play()
+                self.config.sounds.play_sound(self.config.sounds.die)
             self.reset_vals_crash()
 
     def reset_vals_normal(self) -> None:
@@ -115,7 +118,7 @@ class Player(Entity):
     def rotate(self) -> None:
         self.rot = clamp(self.rot + self.vel_rot, self.rot_min, self.rot_max)
 
-    def draw(self) -> None:
+    def update(self) -> None:
         self.update_image()
         if self.mode == PlayerMode.SHM:
             self.tick_shm()
@@ -124,12 +127,18 @@ class Player(Entity):
         elif self.mode == PlayerMode.CRASH:
             self.tick_crash()
 
+    def draw(self) -> None:
         self.draw_player()
 
+    @property
+    def rotated_hit_mask(self) -> pygame.mask.Mask:
+        """hit mask of the sprite as drawn, rotated around the rect center"""
+        return self.atlas.hit_mask(self.img_idx, self.rot)
+
     def draw_player(self) -> None:
-        rotated_image = pygame.transform.rotate(self.image, self.rot)
+        rotated_image = self.atlas.get(self.img_idx, self.rot)
         rotated_rect = rotated_image.get_rect(center=self.rect.center)
-        self.config.screen.blit(rotated_image, rotated_rect)
+        self.config.renderer.blit(rotated_image, rotated_rect)
 
     def stop_wings(self) -> None:
         self.img_gen = cycle([self.img_idx])
@@ -139,7 +148,7 @@ class Player(Entity):
             self.vel_y = self.flap_acc
             self.flapped = True
             self.rot = 80
-            self.config.sounds.wing.play()
+            self.config.sounds.play_sound(self.config.sounds.wing)
 
     def crossed(self, pipe: Pipe) -> bool:
         return pipe.cx <= self.cx < pipe.cx - pipe.vel_x
@@ -153,13 +162,10 @@ class Player(Entity):
             self.crash_entity = "floor"
             return True
 
-        for pipe in pipes.upper:
-            if self.collide(pipe):
-                self.crashed = True
-                self.crash_entity = "pipe"
-                return True
-        for pipe in pipes.lower:
-            if self.collide(pipe):
+        # only pipes around the player's x-range can touch it
+        rect = self.rect
+        for up_pipe, low_pipe in pipes.overlapping(rect.left, rect.right):
+            if self.collide(up_pipe) or self.collide(low_pipe):
                 self.crashed = True
                 self.crash_entity = "pipe"
                 return True
@@ -9,30 +9,39 @@ class Score(Entity):
         super().__init__(config)
         self.y = self.config.window.height * 0.1
         self.score = 0
+        self.surface = None
 
     def reset(self) -> None:
         self.score = 0
+        self.surface = None
 
     def add(self) -> None:
         self.score += 1
-        self.config.sounds.point.play()
+        self.surface = None
+        self.config.sounds.play_sound(self.config.sounds.point)
+
+    def compose(self) -> pygame.Surface:
+        """returns the score digits as one surface, built once per value"""
+        if self.surface is None:
+            images = [
+                self.config.images.numbers[int(x)] for x in str(self.score)
+            ]
+            self.w = sum(image.get_width() for image in images)
+            self.h = max(image.get_height() for image in images)
+            self.x = (self.config.window.width - self.w) / 2
+
+            self.surface = pygame.Surface((self.w, self.h), pygame.SRCALPHA)
+            x_offset = 0
+            for image in images:
+                self.surface.blit(image, (x_offset, 0))
+                x_offset += image.get_width()
+        return self.surface
 
     @property
     def rect(self) -> pygame.Rect:
-        score_digits = [int(x) for x in list(str(self.score))]
-        images = [self.config.images.numbers[digit] for digit in score_digits]
-        w = sum(image.get_width() for image in images)
-        x = (self.config.window.width - w) / 2
-        h = max(image.get_height() for image in images)
-        return pygame.Rect(x, self.y, w, h)
+        self.compose()
+        return super().rect
 
     def draw(self) -> None:
         """displays score in center of screen"""
-        score_digits = [int(x) for x in list(str(self.score))]
-        images = [self.config.images.numbers[digit] for digit in score_digits]
-        digits_width = sum(image.get_width() for image in images)
-        x_offset = (self.config.window.width - digits_width) / 2
-
-        for image in images:
-            self.config.screen.blit(image, (x_offset, self.y))
-            x_offset += image.get_width()
+        self.config.renderer.blit(self.compose(), (self.x, self.y))
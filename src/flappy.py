@@ -1,12 +1,12 @@
 import asyncio
+import os
+import random
 import sys
-import time  # Import time for latency measurement
+import time
+from concurrent.futures import wait
+from functools import partial
 import pygame
 from pygame.locals import K_ESCAPE, K_SPACE, K_UP, KEYDOWN, QUIT
-from prometheus_client import Gauge, start_http_server  # Import Prometheus client
-import aiohttp  # Async HTTP client for network requests
-import psutil  # To measure bandwidth usage
-import boto3  # (Assuming this is used elsewhere in the game)
 
 
 
@@ -20,16 +20,40 @@ from .entities import (
     Score,
     WelcomeMessage,
 )
-from .utils import GameConfig, Images, Sounds, Window
+from .services import AsyncLeaderboard, ScoreSubmitter
+from .simulation import Recorder
+from .utils import FixedTimestep, GameConfig, Hud, Images, Sounds, Window, get_font
+from .utils.constants import ASSET_URLS
+from .utils.endpoints import get_endpoints
+from .utils.profiler import NullProfiler
+from .utils.telemetry import Telemetry
 
 class Flappy:
-    def __init__(self):
-        pygame.init()
+    def __init__(self, profiler=None, started=None):
+        # Times each phase of a frame when given a FrameProfiler, see --profile
+        self.profiler = profiler or NullProfiler()
+        # perf_counter() at launch, for the time to first frame
+        self.started = time.perf_counter() if started is None else started
+        self.first_frame = None
+        # Only what the first frame needs, sound starts after it is up
+        pygame.display.init()
+        pygame.font.init()
         pygame.display.set_caption("Flappy Bird")
         window = Window(288, 512)
-        screen = pygame.display.set_mode((window.width, window.height))
+        # Frames render as fast as they can unless FLAPPY_VSYNC or
+        # FLAPPY_MAX_FPS hold them back, physics has its own fixed rate
+        vsync = bool(os.environ.get("FLAPPY_VSYNC"))
+        screen = pygame.display.set_mode(
+            (window.width, window.height), pygame.SCALED if vsync else 0, vsync=vsync
+        )
+
+        # Images and Sounds queue their downloads on the shared loader,
+        # sprites for the first frame first
         images = Images()
-        self.lambda_client = boto3.client('lambda')  # AWS Lambda client
+        # Scores go out in batches from a background task, see ScoreSubmitter
+        self.submitter = ScoreSubmitter()
+        # Local scores for the rank shown at game over, opened on first use
+        self.leaderboard = AsyncLeaderboard()
 
         self.config = GameConfig(
             screen=screen,
@@ -40,25 +64,42 @@ class Flappy:
             sounds=Sounds(),
         )
 
-        # Initialize the font for the FPS display and player name
-        self.font = pygame.font.SysFont('Arial', 20)
-        self.player_name = "Player"  # Default name
-
-        # Initialize Prometheus Gauges for FPS, Network Latency, and Bandwidth Usage
-        self.fps_metric = Gauge('flappybird_fps', 'Frames Per Second of FlappyBird')
-        self.network_latency_metric = Gauge('flappybird_network_latency', 'Network Latency in milliseconds')
-        self.bandwidth_metric = Gauge('flappybird_bandwidth_usage', 'Bandwidth Usage in KB/s')
-
-        # Start Prometheus HTTP server to serve metrics on port 8000
-        start_http_server(8000)
+        # Player, Pipes and Floor move in fixed steps of 1/fps seconds
+        self.timestep = FixedTimestep(self.config.fps)
 
-        self.latency_check_interval = 5  # Measure network latency every 5 seconds
-        self.last_latency_check = time.time()
+        self.player_name = "Player"  # Default name
 
-        # Initialize variables for bandwidth usage calculation
-        self.last_bytes_recv = 0
-        self.last_bytes_sent = 0
-        self.last_bandwidth_check = time.time()
+        # Frame samples go to a ring buffer, aggregated and exported to
+        # Prometheus on port 8000 from a background thread, along with the
+        # latency of each asset server. The thread starts after the first frame
+        self.telemetry = Telemetry(self.config.fps)
+
+    def after_first_frame(self):
+        """Records the time to first frame and starts what it didn't need, once."""
+        if self.first_frame is not None:
+            return
+        self.first_frame = time.perf_counter() - self.started
+        if self.config.debug:
+            print(f"First frame after {self.first_frame * 1000:.0f} ms")
+            # Assets load lazily, so the timings are only complete once the
+            # prefetched ones are in, waited for off the loop
+            pending = list(self.config.images.loader.futures.values())
+            asyncio.get_running_loop().run_in_executor(None, self.report_assets, pending)
+
+        pygame.mixer.init()
+        # HUD overlay for the FPS display and player name, the system font
+        # lookup can take a while
+        self.hud = Hud(self.config.renderer, get_font('Arial', 20))
+
+        self.telemetry.endpoints = get_endpoints(ASSET_URLS)
+        self.telemetry.first_frame = self.first_frame
+        self.telemetry.start()
+
+    def report_assets(self, pending):
+        """Prints the per-asset load times once the pending loads are done."""
+        wait(pending)
+        # The loader Images and Sounds share, get_loader() without the URL is memoized apart
+        print(self.config.images.loader.report())
 
     async def get_player_name(self):
         """Display a text input field to get the player's name."""
@@ -104,11 +145,16 @@ class Flappy:
             self.config.screen.blit(instruction_text, (50, 150))
 
             pygame.display.flip()
+            self.after_first_frame()
             self.config.clock.tick(30)  # Control the input loop speed
 
         self.player_name = player_name  # Set the name to the class attribute
+        self.config.renderer.invalidate()  # The input screen covered everything
 
     async def start(self):
+        # Deliver scores left over from earlier sessions while we play
+        self.submitter.start()
+
         # Get the player's name using the Pygame text input method
         await self.get_player_name()
 
@@ -118,85 +164,71 @@ class Flappy:
             self.player = Player(self.config)
             self.welcome_message = WelcomeMessage(self.config)
             self.game_over_message = GameOver(self.config)
-            self.pipes = Pipes(self.config)
+            # Seeded per round so the session can be replayed, see Recording
+            seed = random.getrandbits(32)
+            self.pipes = Pipes(self.config, random.Random(seed))
+            self.recorder = Recorder(seed, self.config.images.variant)
             self.score = Score(self.config)
             await self.splash()
             await self.play()
             await self.game_over()
+            # A rank still being looked up belongs to the round that ended
+            self.rank_task.cancel()
+            self.hud.remove('rank')
+            # New sprites for the next round, decoded variants are cached
+            self.config.images.randomize()
 
     async def splash(self):
         """Shows welcome splash screen animation of flappy bird"""
         self.player.set_mode(PlayerMode.SHM)
+        self.timestep.reset()  # Don't catch up on the time spent in menus
 
         while True:
-            for event in pygame.event.get():
+            for event in self.poll_events():
                 self.check_quit_event(event)
                 if self.is_tap_event(event):
                     return
 
-            self.background.tick()
-            self.floor.tick()
-            self.player.tick()
-            self.welcome_message.tick()
+            for _ in range(self.timestep.advance()):
+                self.step(self.floor, self.player)
 
-            # Display FPS and player name on the screen
-            self.display_and_track_fps()
-            self.display_player_name()
-
-            # Check if it's time to measure network latency
-            if time.time() - self.last_latency_check >= self.latency_check_interval:
-                asyncio.create_task(self.measure_network_latency())
-                self.last_latency_check = time.time()
-
-            # Check bandwidth usage every second
-            if time.time() - self.last_bandwidth_check >= 1:
-                await self.measure_bandwidth_usage()
-                self.last_bandwidth_check = time.time()
-
-            pygame.display.update()
-            await asyncio.sleep(0)
-            self.config.tick()
+            self.render(self.background, self.floor, self.player, self.welcome_message)
+            await self.end_frame()
 
     async def play(self):
         self.score.reset()
         self.player.set_mode(PlayerMode.NORMAL)
+        self.recorder.start(self.player)
+        self.frame = 0  # Physics steps since play started, as in Simulation
+        flap = False
 
         while True:
-            if self.player.collided(self.pipes, self.floor):
-                return
-
-            for i, pipe in enumerate(self.pipes.upper):
-                if self.player.crossed(pipe):
-                    self.score.add()
-
-            for event in pygame.event.get():
+            for event in self.poll_events():
                 self.check_quit_event(event)
                 if self.is_tap_event(event):
-                    self.player.flap()  # Simulate action
+                    flap = True  # Applied on the next physics step
 
-            self.background.tick()
-            self.floor.tick()
-            self.pipes.tick()
-            self.score.tick()
-            self.player.tick()
+            for _ in range(self.timestep.advance()):
+                with self.profiler.phase('collided'):
+                    collided = self.player.collided(self.pipes, self.floor)
+                if collided:
+                    return
 
-            # Display FPS and player name on the screen
-            self.display_and_track_fps()
-            self.display_player_name()
+                cx = self.player.cx
+                for pipe, _ in self.pipes.overlapping(cx, cx):
+                    if self.player.crossed(pipe):
+                        self.score.add()
 
-            # Check if it's time to measure network latency
-            if time.time() - self.last_latency_check >= self.latency_check_interval:
-                asyncio.create_task(self.measure_network_latency())
-                self.last_latency_check = time.time()
+                if flap:
+                    self.player.flap()  # Simulate action
+                    self.recorder.flap(self.frame)
+                    flap = False
 
-            # Check bandwidth usage every second
-            if time.time() - self.last_bandwidth_check >= 1:
-                await self.measure_bandwidth_usage()
-                self.last_bandwidth_check = time.time()
+                self.step(self.floor, self.pipes, self.player)
+                self.frame += 1
 
-            pygame.display.update()
-            await asyncio.sleep(0)  # Use a minimal delay to keep the loop responsive
-            self.config.tick()
+            self.render(self.background, self.floor, self.pipes, self.score, self.player)
+            await self.end_frame()
 
     async def game_over(self):
         """Crashes the player down and shows gameover image"""
@@ -204,100 +236,104 @@ class Flappy:
         self.pipes.stop()
         self.floor.stop()
 
+        # Only queues the score, the upload never holds up a frame
+        self.submit_score()
+        self.rank_task = asyncio.create_task(self.show_rank(self.score.score))
+
         # Wait for the player to hit the floor and show game over screen
         while True:
-            for event in pygame.event.get():
+            for event in self.poll_events():
                 self.check_quit_event(event)
                 if self.is_tap_event(event):
                     if self.player.y + self.player.h >= self.floor.y - 1:
                         return
 
-            self.background.tick()
-            self.floor.tick()
-            self.pipes.tick()
-            self.score.tick()
-            self.player.tick()
-            self.game_over_message.tick()
+            for _ in range(self.timestep.advance()):
+                self.step(self.floor, self.pipes, self.player)
 
+            self.render(
+                self.background,
+                self.floor,
+                self.pipes,
+                self.score,
+                self.player,
+                self.game_over_message,
+            )
+            await self.end_frame()
+
+    def poll_events(self):
+        """Pumps the event queue, timed as the 'events' phase."""
+        with self.profiler.phase('events'):
+            return pygame.event.get()
+
+    def step(self, *entities):
+        """Advances entities one physics step, each timed as its own phase, e.g. 'Player.step'."""
+        for entity in entities:
+            with self.profiler.phase(f'{type(entity).__name__}.step'):
+                entity.step()
+
+    def render(self, *entities):
+        """Draws entities in order between the last two physics steps, each timed as its own phase."""
+        alpha = self.timestep.alpha
+        for entity in entities:
+            with self.profiler.phase(type(entity).__name__):
+                entity.render(alpha)
+
+    async def end_frame(self):
+        """Draws the HUD, pushes the frame and waits for the next one."""
+        with self.profiler.phase('hud'):
             # Display FPS and player name on the screen
             self.display_and_track_fps()
             self.display_player_name()
+            self.hud.draw()
 
+        with self.profiler.phase('present'):
+            self.config.renderer.present()
+        await asyncio.sleep(0)  # Use a minimal delay to keep the loop responsive
+        with self.profiler.phase('clock.tick'):
             self.config.tick()
-            pygame.display.update()
-            await asyncio.sleep(0)
-
-        # Call the function to send the score to Lambda
-        await self.send_score_to_lambda()
-
-    async def send_score_to_lambda(self):
-        """Send player score to Lambda function."""
-        # Construct the payload for Lambda function
-        payload = {
-            'user_id': self.player_name,  # Use player name or a unique user ID
-            'score': self.score.value      # Assuming 'self.score.value' holds the score
-        }
-
+        self.profiler.frame()
+
+    def submit_score(self):
+        """Queue the player's score, with its replay, for the background submitter."""
+        recording = self.recorder.finish(self.frame, self.score.score)
+        self.submitter.submit(self.player_name, self.score.score, recording.to_dict())
+
+        # Keep sessions around as replay fixtures when asked to
+        record_dir = os.environ.get("FLAPPY_RECORD_DIR")
+        if record_dir:
+            path = os.path.join(record_dir, f"{recording.seed:08x}.json")
+            saving = asyncio.get_running_loop().run_in_executor(None, recording.save, path)
+            saving.add_done_callback(partial(self.saved_recording, path))
+
+    def saved_recording(self, path, saving):
+        """Reports a recording that couldn't be saved, e.g. to a missing directory."""
+        if not saving.cancelled() and saving.exception() is not None:
+            print(f"Failed to save the recording to {path}: {saving.exception()}")
+
+    async def show_rank(self, score):
+        """Adds the score to the local leaderboard and shows where it places."""
         try:
-            # Invoke the Lambda function
-            response = self.lambda_client.invoke(
-                FunctionName='your-lambda-function-name',  # Replace with your actual Lambda function name
-                InvocationType='Event',  # Use 'Event' to run asynchronously
-                Payload=json.dumps(payload)
-            )
-
-            # Log the Lambda response
-            print(f"Lambda invocation response: {response}")
-        except Exception as e:
-            print(f"Failed to send score to Lambda: {e}")
-    async def measure_network_latency(self):
-        """Measure the network latency by sending a request to a specified endpoint."""
-        url = "http://localhost:8000/metrics"  # Change this to your target URL
-
-        try:
-            async with aiohttp.ClientSession() as session:
-                start_time = time.time()  # Start the timer
-                async with session.get(url) as response:
-                    await response.text()  # Await the response to complete
-                    end_time = time.time()  # End the timer
-                
-                # Calculate latency in milliseconds
-                latency = (end_time - start_time) * 1000
-                self.network_latency_metric.set(latency)  # Set the network latency to Prometheus
+            await self.leaderboard.add([(self.player_name, score, time.time())])
+            best = await self.leaderboard.best(self.player_name)
+            rank = await self.leaderboard.rank(best)
         except Exception as e:
-            print(f"Network request failed: {e}")  # Log the error
-
-    async def measure_bandwidth_usage(self):
-        """Measure the bandwidth usage by tracking bytes sent and received."""
-        net_io = psutil.net_io_counters()
-        current_bytes_recv = net_io.bytes_recv
-        current_bytes_sent = net_io.bytes_sent
-
-        # Calculate the difference since the last check
-        bytes_recv = current_bytes_recv - self.last_bytes_recv
-        bytes_sent = current_bytes_sent - self.last_bytes_sent
-
-        # Update last bytes counters
-        self.last_bytes_recv = current_bytes_recv
-        self.last_bytes_sent = current_bytes_sent
-
-        # Calculate bandwidth usage in KB/s
-        bandwidth_usage = (bytes_recv + bytes_sent) / 1024  # Convert bytes to KB
-
-        # Update the metric
-        self.bandwidth_metric.set(bandwidth_usage)  # Set total bandwidth usage in KB/s
+            # The game goes on without a rank, e.g. when the database is locked
+            print(f"Failed to rank the score: {e}")
+            return
+        self.hud.set('rank', f'Best: {best}  Rank: {rank}', (5, 45))
 
     def display_and_track_fps(self):
-        """Renders the FPS on the screen and exposes it to Prometheus."""
-        fps = int(self.config.clock.get_fps())
-        fps_text = self.font.render(f'FPS: {fps}', True, (255, 255, 255))
-        self.config.screen.blit(fps_text, (5, 5))
-        self.fps_metric.set(fps)  # Update the FPS metric for Prometheus
+        """Renders the FPS on the screen and records the frame time."""
+        clock = self.config.clock
+        fps = int(clock.get_fps())
+        self.hud.set('fps', f'FPS: {fps}', (5, 5))  # Re-rendered only when the value changes
+        # Last frame's time and work, aggregated off the loop by Telemetry
+        self.telemetry.record(clock.get_time(), clock.get_rawtime())
 
     def display_player_name(self):
         """Displays the player's name on the screen."""
-        name_text = self.font.render(f'Player: {self.player_name}', True, (255, 255, 255))
-        self.config.screen.blit(name_text, (5, 25))
+        self.hud.set('name', f'Player: {self.player_name}', (5, 25))
 
     def is_tap_event(self, event):
         return event.type == KEYDOWN and event.key in (K_SPACE, K_UP)
@@ -0,0 +1,25 @@
+"""Replays recorded sessions headless and checks them, see Recording."""
+
+import sys
+import time
+
+from .simulation import Recording, replay
+
+if __name__ == "__main__":
+    failed = 0
+    for path in sys.argv[1:]:
+        recording = Recording.load(path)
+        start = time.perf_counter()
+        state = replay(recording)
+        ms = (time.perf_counter() - start) * 1000
+        ok = state.done and (state.frame, state.score) == (
+            recording.frames,
+            recording.score,
+        )
+        failed += not ok
+        print(
+            f"{path}: {'ok' if ok else 'MISMATCH'} score {state.score}"
+            f"/{recording.score} crash frame {state.frame}/{recording.frames}"
+            f" in {ms:.1f} ms"
+        )
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,25 @@
+"""Hosts headless games for remote players, see GameServer."""
+
+import argparse
+
+from .services.game_server import serve
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="server processes sharing the port (default one per core)",
+    )
+    parser.add_argument(
+        "--stats",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        help="print each worker's session count and load this often",
+    )
+    args = parser.parse_args()
+    serve(args.host, args.port, args.fps, args.workers, args.stats)
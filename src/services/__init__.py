@@ -0,0 +1,19 @@
+from .leaderboard import AsyncLeaderboard, Leaderboard, LeaderboardTransport
+from .score_submitter import (
+    HttpTransport,
+    LambdaTransport,
+    RejectedBatch,
+    ScoreSubmitter,
+    ScoreTransport,
+)
+
+__all__ = [
+    "AsyncLeaderboard",
+    "HttpTransport",
+    "LambdaTransport",
+    "Leaderboard",
+    "LeaderboardTransport",
+    "RejectedBatch",
+    "ScoreSubmitter",
+    "ScoreTransport",
+]
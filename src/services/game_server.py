@@ -0,0 +1,320 @@
+"""
+Authoritative games for remote players, many headless sessions per process.
+
+Each connection gets its own Simulation, the same Player/Pipes/Score world
+Flappy plays, and one TickScheduler steps all of them on a shared fixed
+clock. Clients only send flaps: every byte received is one flap, applied on
+the session's next step, and a flap after the game ended starts a new one.
+The server answers with fixed-size little endian messages:
+
+    HELLO  kind=0, seed, variant (bg, player, pipe), fps   on every new game
+    STATE  kind=1, frame, score, y, vel_y, done            after every step
+
+The pipes follow from the seed, so clients can draw the whole game from
+these. `serve` runs one server per core on the same port with
+SO_REUSEPORT, letting the kernel spread the connections.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import struct
+import time
+from typing import Callable, Optional, Set
+
+from ..simulation import Recorder, Recording, Simulation, headless_config
+from ..utils import FixedTimestep
+
+HELLO = struct.Struct("<BI3BH")
+STATE = struct.Struct("<BIHffB")
+KIND_HELLO = 0
+KIND_STATE = 1
+
+
+class GameSession:
+    """
+    One player's game. States are snapshots, so when the client falls more
+    than `max_buffer` bytes behind, new ones are dropped rather than queued.
+    """
+
+    def __init__(
+        self,
+        writer: asyncio.StreamWriter,
+        simulation: Simulation,
+        fps: int = 30,
+        max_buffer: int = 4096,
+    ) -> None:
+        self.writer = writer
+        self.simulation = simulation
+        # the rate the scheduler steps it at, which the client plays back at
+        self.fps = fps
+        self.max_buffer = max_buffer
+        self.flapped = False
+        self.finished = True
+        self.dropped = 0
+        self.recorder: Optional[Recorder] = None
+
+    def new_game(self) -> None:
+        seed = random.getrandbits(32)
+        variant = self.simulation.config.images.variant
+        self.simulation.reset(seed)
+        self.recorder = Recorder(seed, variant)
+        self.recorder.start(self.simulation.player)
+        self.flapped = False
+        self.finished = False
+        self.writer.write(HELLO.pack(KIND_HELLO, seed, *variant, self.fps))
+
+    def flap(self) -> None:
+        if self.simulation.done:
+            self.new_game()
+        else:
+            self.flapped = True  # Applied on the next step
+
+    def step(self) -> Optional[Recording]:
+        """advances one frame, returns the Recording when the game ended"""
+        simulation = self.simulation
+        if self.flapped:
+            self.recorder.flap(simulation.frame)
+            self.flapped = False
+            simulation.advance(True)
+        else:
+            simulation.advance()
+        player = simulation.player
+        self.send(
+            STATE.pack(
+                KIND_STATE,
+                simulation.frame,
+                simulation.score.score,
+                player.y,
+                player.vel_y,
+                simulation.done,
+            )
+        )
+        if simulation.done:
+            self.finished = True
+            return self.recorder.finish(
+                simulation.frame, simulation.score.score
+            )
+        return None
+
+    def send(self, data: bytes) -> None:
+        if self.writer.transport.get_write_buffer_size() > self.max_buffer:
+            self.dropped += 1
+            return
+        self.writer.write(data)
+
+
+class TickScheduler:
+    """
+    Steps every live session once per tick at `fps` ticks a second, see
+    FixedTimestep. When the sessions take longer than a tick to step, the
+    missed ticks are caught up, at most `max_steps` at once, and the rest
+    are counted in `dropped`. A session whose step or `on_game_over`
+    raises is logged and dropped, the others keep going.
+    """
+
+    def __init__(
+        self,
+        fps: int = 30,
+        max_steps: int = 5,
+        on_game_over: Optional[Callable[[Recording], None]] = None,
+    ) -> None:
+        self.fps = fps
+        self.timestep = FixedTimestep(fps, max_steps)
+        self.on_game_over = on_game_over
+        self.sessions: Set[GameSession] = set()
+        self.ticks = 0
+        self.busy = 0.0
+        self.started = time.perf_counter()
+
+    def tick(self) -> None:
+        failed = []
+        for session in self.sessions:
+            if session.finished:
+                continue
+            try:
+                recording = session.step()
+                if recording is not None and self.on_game_over is not None:
+                    self.on_game_over(recording)
+            except Exception as e:
+                print(f"Dropping a session after an error: {e!r}")
+                failed.append(session)
+        for session in failed:
+            self.drop(session)
+        self.ticks += 1
+
+    def drop(self, session: GameSession) -> None:
+        self.sessions.discard(session)
+        session.writer.close()
+
+    async def run(self) -> None:
+        self.timestep.reset()
+        self.started = time.perf_counter()
+        while True:
+            start = time.perf_counter()
+            for _ in range(self.timestep.advance()):
+                self.tick()
+            self.busy += time.perf_counter() - start
+            # until the next tick is due
+            await asyncio.sleep(self.timestep.dt - self.timestep.accumulator)
+
+    def stats(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "sessions": len(self.sessions),
+            "ticks": self.ticks,
+            "dropped_ticks": self.timestep.dropped,
+            # share of wall time spent stepping, 1 means no headroom left
+            "load": self.busy / elapsed if elapsed else 0.0,
+        }
+
+
+class GameServer:
+    """
+    Accepts clients on `host`:`port` and plays a game for each of them:
+
+        server = GameServer(port=7777)
+        await server.start()
+        await server.serve_forever()
+
+    `on_game_over` gets the Recording of every finished game, e.g. to hand
+    it to a ScoreSubmitter along with the score.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 7777,
+        fps: int = 30,
+        reuse_port: bool = False,
+        max_buffer: int = 4096,
+        backlog: int = 1024,
+        on_game_over: Optional[Callable[[Recording], None]] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.reuse_port = reuse_port
+        self.max_buffer = max_buffer
+        # thousands of players may connect at once, asyncio defaults to 100
+        self.backlog = backlog
+        self.config = headless_config()
+        self.scheduler = TickScheduler(fps, on_game_over=on_game_over)
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self) -> int:
+        """starts listening and ticking, returns the port"""
+        self.server = await asyncio.start_server(
+            self.handle,
+            self.host,
+            self.port,
+            reuse_port=self.reuse_port,
+            backlog=self.backlog,
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.task = asyncio.create_task(self.scheduler.run())
+        self.task.add_done_callback(self.scheduler_done)
+        return self.port
+
+    def scheduler_done(self, task: asyncio.Task) -> None:
+        if task.cancelled():
+            return
+        print(f"Tick scheduler stopped: {task.exception()!r}")
+        # no game would advance any more, so stop taking players
+        if self.server is not None:
+            self.server.close()
+
+    async def serve_forever(self) -> None:
+        if self.server is None:
+            await self.start()
+        await self.server.serve_forever()
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        session = GameSession(
+            writer,
+            Simulation(self.config),
+            self.scheduler.fps,
+            self.max_buffer,
+        )
+        session.new_game()
+        self.scheduler.sessions.add(session)
+        try:
+            while True:
+                data = await reader.read(256)
+                if not data:
+                    break
+                for _ in data:
+                    session.flap()
+        except ConnectionError:
+            pass
+        finally:
+            self.scheduler.sessions.discard(session)
+            writer.close()
+
+
+async def run_server(
+    host: str, port: int, fps: int, reuse_port: bool, stats: float
+) -> None:
+    server = GameServer(host, port, fps, reuse_port)
+    await server.start()
+    if stats:
+
+        async def report() -> None:
+            while True:
+                await asyncio.sleep(stats)
+                print(f"[{os.getpid()}] {server.scheduler.stats()}")
+
+        asyncio.create_task(report())
+    await server.serve_forever()
+
+
+def run_worker(*args) -> None:
+    try:
+        asyncio.run(run_server(*args))
+    except KeyboardInterrupt:
+        pass
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 7777,
+    fps: int = 30,
+    workers: Optional[int] = None,
+    stats: float = 0,
+) -> None:
+    """
+    runs `workers` server processes, one per core by default, all bound to
+    `port`. Without SO_REUSEPORT only one process serves.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or not hasattr(socket, "SO_REUSEPORT"):
+        run_worker(host, port, fps, False, stats)
+        return
+
+    processes = [
+        multiprocessing.Process(
+            target=run_worker,
+            args=(host, port, fps, True, stats),
+            name=f"game-server-{i}",
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()
@@ -0,0 +1,187 @@
+import asyncio
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+from ..utils.asset_cache import CACHE_DIR
+from .score_submitter import ScoreTransport
+
+LEADERBOARD_DB = os.environ.get(
+    "FLAPPY_LEADERBOARD_DB", os.path.join(CACHE_DIR, "leaderboard.db")
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    player_name TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    time REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS best (
+    player_name TEXT PRIMARY KEY,
+    score INTEGER NOT NULL,
+    time REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS best_by_score ON best (score DESC, time);
+CREATE TABLE IF NOT EXISTS best_counts (
+    score INTEGER PRIMARY KEY,
+    players INTEGER NOT NULL
+);
+"""
+
+
+class Leaderboard:
+    """
+    Scores in SQLite, one connection in WAL mode. Every score is kept in
+    `scores`, and each player's best in `best`, indexed by score for the
+    top of the board. `best_counts` is a histogram of the best scores, so
+    a rank sums one row per distinct score above it instead of counting
+    players, and stays fast however many players there are.
+
+    Ranks and the top are by each player's best score. The connection
+    belongs to the thread that opened it, see AsyncLeaderboard for the
+    game's side.
+    """
+
+    def __init__(self, path: str = LEADERBOARD_DB) -> None:
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        # WAL stays consistent without fsyncing every commit
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def add(self, scores: Iterable[Tuple[str, int, float]]) -> None:
+        """writes (player_name, score, time) rows in one transaction"""
+        scores = list(scores)
+        # the batch's best per player, the earliest on ties
+        bests = {}
+        for name, score, time in scores:
+            best = bests.get(name)
+            if best is None or (score, -time) > (best[0], -best[1]):
+                bests[name] = (score, time)
+
+        with self.db:
+            self.db.executemany("INSERT INTO scores VALUES (?, ?, ?)", scores)
+            names = list(bests)
+            old = {}
+            # the players' current bests, a chunk of names per query
+            for start in range(0, len(names), 500):
+                chunk = names[start : start + 500]
+                old.update(
+                    self.db.execute(
+                        "SELECT player_name, score FROM best WHERE player_name"
+                        f" IN ({', '.join('?' * len(chunk))})",
+                        chunk,
+                    )
+                )
+            improved = [
+                (name, score, time)
+                for name, (score, time) in bests.items()
+                if name not in old or score > old[name]
+            ]
+            self.db.executemany(
+                "INSERT OR REPLACE INTO best VALUES (?, ?, ?)", improved
+            )
+            self.db.executemany(
+                "UPDATE best_counts SET players = players - 1 WHERE score = ?",
+                [(old[name],) for name, _, _ in improved if name in old],
+            )
+            self.db.executemany(
+                "INSERT INTO best_counts VALUES (?, 1) ON CONFLICT (score)"
+                " DO UPDATE SET players = players + 1",
+                [(score,) for _, score, _ in improved],
+            )
+
+    def add_records(self, records: Iterable[dict]) -> None:
+        """adds ScoreSubmitter records, see LeaderboardTransport"""
+        self.add((r["user_id"], r["score"], r["time"]) for r in records)
+
+    def top(self, k: int = 10) -> List[Tuple[str, int]]:
+        """the k best players as (player_name, score), earliest first on ties"""
+        return self.db.execute(
+            "SELECT player_name, score FROM best ORDER BY score DESC, time"
+            " LIMIT ?",
+            (k,),
+        ).fetchall()
+
+    def best(self, player_name: str) -> Optional[int]:
+        row = self.db.execute(
+            "SELECT score FROM best WHERE player_name = ?", (player_name,)
+        ).fetchone()
+        return row and row[0]
+
+    def rank(self, score: int) -> int:
+        """where a best of `score` places, 1 + players with a higher best"""
+        (above,) = self.db.execute(
+            "SELECT COALESCE(SUM(players), 0) FROM best_counts WHERE score > ?",
+            (score,),
+        ).fetchone()
+        return above + 1
+
+    def players(self) -> int:
+        (count,) = self.db.execute(
+            "SELECT COALESCE(SUM(players), 0) FROM best_counts"
+        ).fetchone()
+        return count
+
+    def close(self) -> None:
+        self.db.close()
+
+
+class AsyncLeaderboard:
+    """
+    A Leaderboard on its own thread, so no query ever blocks the event
+    loop. The database is opened on first use:
+
+        rank = await leaderboard.rank(score)
+    """
+
+    def __init__(self, path: str = LEADERBOARD_DB) -> None:
+        self.path = path
+        self.board: Optional[Leaderboard] = None
+        # one thread, sqlite connections can't be shared between threads
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="leaderboard"
+        )
+
+    def call(self, method: str, *args):
+        if self.board is None:
+            self.board = Leaderboard(self.path)
+        return getattr(self.board, method)(*args)
+
+    async def run(self, method: str, *args):
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, self.call, method, *args
+        )
+
+    async def add(self, scores: Iterable[Tuple[str, int, float]]) -> None:
+        await self.run("add", list(scores))
+
+    async def add_records(self, records: Iterable[dict]) -> None:
+        await self.run("add_records", list(records))
+
+    async def top(self, k: int = 10) -> List[Tuple[str, int]]:
+        return await self.run("top", k)
+
+    async def best(self, player_name: str) -> Optional[int]:
+        return await self.run("best", player_name)
+
+    async def rank(self, score: int) -> int:
+        return await self.run("rank", score)
+
+    async def close(self) -> None:
+        if self.board is not None:
+            await self.run("close")
+        self.executor.shutdown(wait=False)
+
+
+class LeaderboardTransport(ScoreTransport):
+    """Delivers ScoreSubmitter batches to a local leaderboard."""
+
+    def __init__(self, leaderboard: AsyncLeaderboard) -> None:
+        self.leaderboard = leaderboard
+
+    async def send(self, scores: List[dict]) -> None:
+        await self.leaderboard.add_records(scores)
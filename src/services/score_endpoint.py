@@ -0,0 +1,45 @@
+from typing import List
+
+from aiohttp import web
+
+
+class LocalScoreEndpoint:
+    """
+    Local stand-in for the score service that HttpTransport can post to.
+    Keeps every accepted score and can reject the first `fail_first`
+    requests to exercise retries:
+
+        endpoint = LocalScoreEndpoint(fail_first=2)
+        url = await endpoint.start()
+    """
+
+    def __init__(self, port: int = 0, fail_first: int = 0) -> None:
+        self.port = port
+        self.fail_first = fail_first
+        self.requests = 0
+        self.scores: List[dict] = []
+        self.runner = None
+        self.url = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.requests <= self.fail_first:
+            return web.Response(status=503)
+        payload = await request.json()
+        self.scores.extend(payload["scores"])
+        return web.json_response({"accepted": len(payload["scores"])})
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post("/scores", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", self.port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/scores"
+        return self.url
+
+    async def stop(self) -> None:
+        if self.runner is not None:
+            await self.runner.cleanup()
@@ -0,0 +1,314 @@
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from functools import partial
+from typing import List, Optional
+
+from ..utils.asset_cache import CACHE_DIR
+from ..utils.endpoints import get_endpoints
+
+SCORE_SPOOL = os.environ.get(
+    "FLAPPY_SCORE_SPOOL", os.path.join(CACHE_DIR, "scores.spool")
+)
+
+
+class RejectedBatch(Exception):
+    """A batch that would fail the same way however often it is retried."""
+
+
+class ScoreTransport:
+    """
+    Delivers a batch of score records, raising if it wasn't accepted:
+    RejectedBatch when retrying can't help, anything else when it might.
+    """
+
+    async def send(self, scores: List[dict]) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class LambdaTransport(ScoreTransport):
+    """Invokes an AWS Lambda function with {"scores": [...]}."""
+
+    def __init__(self, function_name: str) -> None:
+        self.function_name = function_name
+        self.client = None
+
+    def invoke(self, payload: bytes) -> None:
+        try:
+            # slow to import, only needed once scores go out
+            import boto3
+            from botocore.exceptions import (
+                ClientError,
+                NoCredentialsError,
+                NoRegionError,
+                PartialCredentialsError,
+            )
+        except ImportError as e:
+            raise RejectedBatch(f"no Lambda client: {e}") from e
+
+        try:
+            if self.client is None:
+                self.client = boto3.client("lambda")
+            response = self.client.invoke(
+                FunctionName=self.function_name,
+                InvocationType="Event",  # Use 'Event' to run asynchronously
+                Payload=payload,
+            )
+        except (
+            NoCredentialsError,
+            NoRegionError,
+            PartialCredentialsError,
+        ) as e:
+            raise RejectedBatch(f"no Lambda client: {e}") from e
+        except ClientError as e:
+            status = e.response.get("ResponseMetadata", {}).get(
+                "HTTPStatusCode", 500
+            )
+            # throttling and service errors pass, the rest won't
+            if status < 500 and status != 429:
+                raise RejectedBatch(str(e)) from e
+            raise
+        if "FunctionError" in response:
+            raise RejectedBatch(
+                f"{self.function_name} failed: {response['FunctionError']}"
+            )
+
+    async def send(self, scores: List[dict]) -> None:
+        payload = json.dumps({"scores": scores}).encode()
+        # boto3 blocks, keep it off the event loop
+        await asyncio.get_running_loop().run_in_executor(
+            None, partial(self.invoke, payload)
+        )
+
+
+class HttpTransport(ScoreTransport):
+    """
+    POSTs {"scores": [...]} as JSON over one keep-alive session. `url` may
+    list several score services separated by commas, each batch goes to the
+    fastest healthy one, see EndpointPool.
+    """
+
+    def __init__(self, url: str, timeout: float = 5) -> None:
+        self.url = url
+        self.endpoints = get_endpoints(url)
+        self.timeout = timeout
+        self.session = None
+
+    async def send(self, scores: List[dict]) -> None:
+        import aiohttp
+
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        error = None
+        for url in self.endpoints.ranked():
+            start = time.perf_counter()
+            try:
+                async with self.session.post(url, json={"scores": scores}) as r:
+                    r.raise_for_status()
+            except aiohttp.ClientResponseError as e:
+                if e.status >= 500:
+                    self.endpoints.fail(url)
+                    error = e
+                    continue
+                # it answered, it's the batch it didn't take, not down
+                self.endpoints.observe(url, time.perf_counter() - start)
+                if e.status in (408, 429):
+                    error = e  # busy, the batch may go through later
+                    continue
+                raise RejectedBatch(f"{url} answered {e.status}") from e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.endpoints.fail(url)
+                error = e
+                continue
+            self.endpoints.observe(url, time.perf_counter() - start)
+            return
+        raise error or ConnectionError("no score endpoints available")
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+
+
+def default_transport() -> ScoreTransport:
+    url = os.environ.get("FLAPPY_SCORE_URL")
+    if url:
+        return HttpTransport(url)
+    return LambdaTransport(
+        os.environ.get("FLAPPY_SCORE_LAMBDA", "your-lambda-function-name")
+    )
+
+
+class ScoreSubmitter:
+    """
+    Queues scores from the game loop and delivers them in batches from a
+    background task. `submit` only appends to a queue, so it never blocks a
+    frame. Unsent scores are spooled to disk and picked up again on the next
+    start; failed batches are retried with capped exponential backoff, and
+    batches the transport rejects for good are appended to `rejected_path`
+    instead, so they don't hold up the ones behind them.
+    """
+
+    def __init__(
+        self,
+        transport: Optional[ScoreTransport] = None,
+        spool_path: str = SCORE_SPOOL,
+        batch_size: int = 20,
+        linger: float = 0.5,
+        backoff: float = 1,
+        max_backoff: float = 60,
+        rejected_path: Optional[str] = None,
+    ) -> None:
+        self.transport = transport or default_transport()
+        self.spool_path = spool_path
+        self.rejected_path = rejected_path or f"{spool_path}.rejected"
+        self.batch_size = batch_size
+        self.linger = linger
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # made in the running loop, see get_queue
+        self.queue: Optional[asyncio.Queue] = None
+        self.pending: List[dict] = []
+        self.task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.rejected = 0
+
+    def submit(
+        self, player_name: str, score: int, replay: Optional[dict] = None
+    ) -> None:
+        """
+        hands a score to the background task, safe to call every frame.
+        `replay` is the session's Recording.to_dict(), for verification.
+        """
+        record = {
+            "id": uuid.uuid4().hex,
+            "user_id": player_name,
+            "score": score,
+            "time": time.time(),
+        }
+        if replay is not None:
+            record["replay"] = replay
+        self.get_queue().put_nowait(record)
+
+    def get_queue(self) -> asyncio.Queue:
+        # before Python 3.10 a Queue binds to the loop current when it is
+        # created, Flappy builds the submitter before asyncio.run
+        if self.queue is None:
+            self.queue = asyncio.Queue()
+        return self.queue
+
+    def start(self) -> None:
+        if self.task is None:
+            self.get_queue()
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """cancels delivery, whatever is unsent stays in the spool"""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        await self.transport.close()
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        self.get_queue()
+        self.pending = await loop.run_in_executor(None, self.read_spool)
+        attempt = 0
+        try:
+            while True:
+                if not self.pending:
+                    self.pending.append(await self.queue.get())
+                    await self.save_spool()
+                    # let scores finishing around the same time join the batch
+                    await self.collect(self.linger)
+
+                batch = self.pending[: self.batch_size]
+                try:
+                    await self.transport.send(batch)
+                    self.sent += len(batch)
+                except RejectedBatch as e:
+                    print(f"Dropping {len(batch)} scores, not accepted: {e}")
+                    await loop.run_in_executor(None, self.write_rejected, batch)
+                    self.rejected += len(batch)
+                except Exception as e:
+                    delay = min(self.max_backoff, self.backoff * 2**attempt)
+                    attempt += 1
+                    print(f"Failed to send {len(batch)} scores, retrying: {e}")
+                    await self.collect(delay * random.uniform(0.5, 1))
+                    continue
+
+                attempt = 0
+                del self.pending[: len(batch)]
+                self.drain_queue()
+                await self.save_spool()
+        finally:
+            # cancelled on shutdown, nothing left to block but the exit
+            self.drain_queue()
+            self.write_spool(self.pending)
+
+    async def collect(self, timeout: float) -> None:
+        """waits up to timeout, spooling scores as they are submitted"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                score = await asyncio.wait_for(self.queue.get(), remaining)
+            except asyncio.TimeoutError:
+                return
+            self.pending.append(score)
+            self.drain_queue()
+            await self.save_spool()
+
+    def drain_queue(self) -> bool:
+        drained = False
+        while not self.queue.empty():
+            self.pending.append(self.queue.get_nowait())
+            drained = True
+        return drained
+
+    def read_spool(self) -> List[dict]:
+        try:
+            with open(self.spool_path) as f:
+                lines = [line for line in f if line.strip()]
+        except OSError:
+            return []
+        scores = []
+        for line in lines:
+            # e.g. a line cut short by a crash, the others are still good
+            try:
+                scores.append(json.loads(line))
+            except ValueError:
+                print(f"Skipping an unreadable line in {self.spool_path}")
+        return scores
+
+    def write_spool(self, scores: List[dict]) -> None:
+        os.makedirs(os.path.dirname(self.spool_path) or ".", exist_ok=True)
+        tmp_path = f"{self.spool_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.writelines(json.dumps(score) + "\n" for score in scores)
+        os.replace(tmp_path, self.spool_path)
+
+    def write_rejected(self, scores: List[dict]) -> None:
+        """appends scores that were never accepted, for a look later"""
+        os.makedirs(os.path.dirname(self.rejected_path) or ".", exist_ok=True)
+        with open(self.rejected_path, "a") as f:
+            f.writelines(json.dumps(score) + "\n" for score in scores)
+
+    async def save_spool(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.write_spool, list(self.pending)
+        )
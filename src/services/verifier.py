@@ -0,0 +1,236 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import List, NamedTuple, Optional, Tuple
+
+from ..simulation import WING_CYCLE, Recording, make_headless_config, replay
+from ..utils import GameConfig
+from ..utils.images import check_variant
+from ..utils.utils import memoize
+
+# an hour of play at 30 fps, longer claims are rejected without a replay
+MAX_FRAMES = 30 * 60 * 60
+
+
+class Verdict(NamedTuple):
+    accepted: bool
+    # what the replay scored, -1 when it couldn't be replayed
+    score: int
+    claimed: int
+    reason: str
+
+
+@memoize
+def replay_config() -> GameConfig:
+    """this process's own config, replays never touch the shared one"""
+    return make_headless_config()
+
+
+def is_int(value) -> bool:
+    # bools are ints too, but never a valid field
+    return type(value) is int
+
+
+def invalid(recording: Recording, max_frames: int) -> Optional[str]:
+    """why the recording can't come from a real session, or None"""
+    if not is_int(recording.seed) or not 0 <= recording.seed < 2**32:
+        return "bad seed"
+    try:
+        check_variant(recording.variant)
+    except ValueError:
+        return "bad variant"
+    y = recording.player_y
+    height = replay_config().window.viewport_height
+    # NaN fails the comparison too
+    if type(y) not in (int, float) or not 0 <= y <= height:
+        return "bad player_y"
+    frame = recording.player_frame
+    if not is_int(frame) or not 0 <= frame < WING_CYCLE:
+        return "bad player_frame"
+    if not is_int(recording.frames) or recording.frames < 0:
+        return "bad frames"
+    if recording.frames > max_frames:
+        return "too long"
+    return None
+
+
+def check(
+    data: dict, claimed: int, max_frames: int = MAX_FRAMES
+) -> Tuple[bool, int, str]:
+    """replays a Recording.to_dict() and compares it with the claim"""
+    # anything a submission does wrong rejects it alone, never its batch
+    try:
+        recording = Recording.from_dict(data)
+    except Exception as e:
+        return False, -1, f"malformed: {e!r}"
+    reason = invalid(recording, max_frames)
+    if reason is not None:
+        return False, -1, reason
+
+    try:
+        state = replay(recording, replay_config())
+    except Exception as e:
+        return False, -1, f"replay failed: {e!r}"
+    if not state.done:
+        return False, state.score, "no crash"
+    if state.frame != recording.frames:
+        return False, state.score, "crash frame mismatch"
+    if state.score != claimed:
+        return False, state.score, "score mismatch"
+    return True, state.score, "ok"
+
+
+def check_batch(
+    batch: List[Tuple[dict, int]], max_frames: int
+) -> List[Tuple[bool, int, str]]:
+    """runs in a worker process, one round trip for the whole batch"""
+    return [check(data, claimed, max_frames) for data, claimed in batch]
+
+
+class ReplayVerifier:
+    """
+    Re-plays submitted recordings on a process pool and accepts a score
+    only if the game's own Player/Pipes/collision logic reproduces it:
+
+        verifier = ReplayVerifier()
+        verifier.start()
+        verdict = await verifier.verify(record["replay"], record["score"])
+
+    Submissions wait in a queue of at most `max_queue`, `verify` blocks
+    when it is full, so producers slow down to what the pool sustains.
+    Queued submissions go out in batches of up to `batch_size`, with at
+    most two batches per worker in flight.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        batch_size: int = 64,
+        max_queue: int = 4096,
+        max_frames: int = MAX_FRAMES,
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.max_frames = max_frames
+        self.max_queue = max_queue
+        # made in the running loop, see get_queue
+        self.queue: Optional[asyncio.Queue] = None
+        self.slots: Optional[asyncio.Semaphore] = None
+        # spawned, forking would copy the asset loader's threads and locks
+        self.pool = ProcessPoolExecutor(
+            self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.task: Optional[asyncio.Task] = None
+
+        self.submitted = 0
+        self.verified = 0
+        self.accepted = 0
+        self.in_flight = 0
+        self.started = time.perf_counter()
+        self.last_stats = (self.started, 0)
+
+    async def verify(self, data: dict, claimed: int) -> Verdict:
+        """the Verdict for a Recording.to_dict() claiming `claimed` points"""
+        future = asyncio.get_running_loop().create_future()
+        await self.get_queue().put((data, claimed, future))
+        self.submitted += 1
+        return await future
+
+    def try_verify(self, data: dict, claimed: int) -> Optional[asyncio.Future]:
+        """like verify, but returns None instead of waiting when full"""
+        queue = self.get_queue()
+        if queue.full():
+            return None
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait((data, claimed, future))
+        self.submitted += 1
+        return future
+
+    def get_queue(self) -> asyncio.Queue:
+        # before Python 3.10 a Queue binds to the loop current when it is
+        # created, which needn't be the one verifying
+        if self.queue is None:
+            self.queue = asyncio.Queue(self.max_queue)
+        return self.queue
+
+    def start(self) -> None:
+        if self.task is None:
+            self.started = time.perf_counter()
+            self.last_stats = (self.started, self.verified)
+            self.get_queue()
+            self.slots = asyncio.Semaphore(self.workers * 2)
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        self.pool.shutdown(cancel_futures=True)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            # whatever queued up meanwhile rides along
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            try:
+                await self.slots.acquire()
+            except asyncio.CancelledError:
+                for _, _, future in batch:
+                    future.cancel()
+                raise
+            self.in_flight += len(batch)
+            work = loop.run_in_executor(
+                self.pool,
+                check_batch,
+                [(data, claimed) for data, claimed, _ in batch],
+                self.max_frames,
+            )
+            work.add_done_callback(partial(self.finish, batch))
+
+    def finish(self, batch: list, work: asyncio.Future) -> None:
+        self.slots.release()
+        self.in_flight -= len(batch)
+        if work.cancelled():
+            for _, _, future in batch:
+                future.cancel()
+            return
+        error = work.exception()
+        if error is not None:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for (_, claimed, future), (ok, score, reason) in zip(
+            batch, work.result()
+        ):
+            self.verified += 1
+            self.accepted += ok
+            if not future.done():
+                future.set_result(Verdict(ok, score, claimed, reason))
+
+    def stats(self) -> dict:
+        """counts so far, and replays a second since the last call"""
+        now = time.perf_counter()
+        last_time, last_verified = self.last_stats
+        self.last_stats = (now, self.verified)
+        return {
+            "submitted": self.submitted,
+            "verified": self.verified,
+            "accepted": self.accepted,
+            "rejected": self.verified - self.accepted,
+            "queued": self.queue.qsize() if self.queue else 0,
+            "in_flight": self.in_flight,
+            "per_second": (self.verified - last_verified)
+            / max(now - last_time, 1e-9),
+        }
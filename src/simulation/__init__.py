@@ -0,0 +1,20 @@
+from .recording import Recorder, Recording, replay, verify
+from .simulation import (
+    WING_CYCLE,
+    Simulation,
+    SimulationState,
+    headless_config,
+    make_headless_config,
+)
+
+__all__ = [
+    "WING_CYCLE",
+    "Recorder",
+    "Recording",
+    "Simulation",
+    "SimulationState",
+    "headless_config",
+    "make_headless_config",
+    "replay",
+    "verify",
+]
@@ -0,0 +1,237 @@
+"""
+Vectorized play-mode engine for many birds at once.
+
+Every bird runs its own game: player state, pipe slots and score live in
+NumPy arrays indexed by bird, and a single `step` advances all of them.
+Physics and spawn rules mirror `Player.tick_normal`, `Player.flap`,
+`Pipes.update` and `Player.collided`; pixel collisions are answered from
+offset lookup tables built once from the sprites' hit masks.
+
+NumPy is an optional dependency, so this module is not imported by
+`src.simulation` itself.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pygame
+
+from ..utils import GameConfig, get_hit_mask
+from .simulation import headless_config
+
+# most pipe pairs ever alive for one bird is three, keep one spare slot
+PIPE_SLOTS = 4
+
+CRASH_NONE = 0
+CRASH_FLOOR = 1
+CRASH_PIPE = 2
+
+
+def _overlap_table(
+    mask: pygame.mask.Mask, other: pygame.mask.Mask
+) -> np.ndarray:
+    """
+    returns table[dx + ow - 1, dy + oh - 1] telling if `other` placed at
+    (dx, dy) relative to `mask` overlaps it.
+    """
+    w, h = mask.get_size()
+    ow, oh = other.get_size()
+    table = np.zeros((w + ow - 1, h + oh - 1), dtype=bool)
+    for i, dx in enumerate(range(-ow + 1, w)):
+        for j, dy in enumerate(range(-oh + 1, h)):
+            table[i, j] = mask.overlap(other, (dx, dy)) is not None
+    return table
+
+
+class BatchSimulation:
+    """
+    Steps `n` independent play-mode games in lockstep. Finished birds are
+    frozen until `reset` is called for them.
+    """
+
+    def __init__(
+        self,
+        n: int,
+        config: Optional[GameConfig] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.n = n
+        self.config = config or headless_config()
+        self.rng = np.random.default_rng(seed)
+
+        window = self.config.window
+        images = self.config.images
+        player_image = images.player[0]
+        pipe_image = images.pipe[0]
+
+        # player constants, see Player.__init__ and reset_vals_normal
+        self.player_x = int(window.width * 0.2)
+        self.player_w = player_image.get_width()
+        self.player_h = player_image.get_height()
+        self.start_y = int((window.height - self.player_h) / 2)
+        self.min_y = -2 * self.player_h
+        self.max_y = window.viewport_height - self.player_h * 0.75
+        self.player_cx = self.player_x + self.player_w / 2
+        self.max_vel_y = 10
+        self.acc_y = 1
+        self.flap_acc = -9
+        self.vel_rot = -3
+        self.rot_min = -90
+        self.rot_max = 20
+
+        # pipe constants, see Pipe and Pipes
+        self.pipe_w = pipe_image.get_width()
+        self.pipe_h = pipe_image.get_height()
+        self.pipe_gap = 120
+        self.pipe_vel_x = -5
+        self.spawn_x = window.width + 10
+        self.spawn_limit = window.width - self.pipe_w * 3.5
+        self.gap_low = int(window.viewport_height * 0.2)
+        self.gap_range = int(window.viewport_height * 0.6 - self.pipe_gap)
+        self.initial_x = window.width + self.pipe_w * 3
+        self.initial_spacing = self.pipe_w * 3.5
+
+        # floor constants, see Floor
+        self.floor_y = int(window.viewport_height)
+        self.floor_vel_x = 4
+        self.floor_x_extra = images.base.get_width() - window.width
+
+        # collision lookup tables, the player keeps the hit mask of its
+        # first frame for the whole game
+        player_mask = get_hit_mask(player_image)
+        self.upper_table = _overlap_table(
+            player_mask, get_hit_mask(images.pipe[0])
+        )
+        self.lower_table = _overlap_table(
+            player_mask, get_hit_mask(images.pipe[1])
+        )
+        self.floor_table = _overlap_table(
+            player_mask, get_hit_mask(images.base)
+        )
+
+        self.y = np.zeros(n)
+        self.vel_y = np.zeros(n)
+        self.rot = np.zeros(n)
+        self.flapped = np.zeros(n, dtype=bool)
+        self.floor_x = np.zeros(n)
+        self.frame = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        self.crash = np.zeros(n, dtype=np.int8)
+
+        self.pipe_x = np.zeros((n, PIPE_SLOTS))
+        self.pipe_gap_y = np.zeros((n, PIPE_SLOTS))
+        self.pipe_active = np.zeros((n, PIPE_SLOTS), dtype=bool)
+
+        self.reset()
+
+    def random_gaps(self, count: int) -> np.ndarray:
+        """same distribution as Pipes.make_random_pipes"""
+        return self.rng.integers(0, self.gap_range, count) + self.gap_low
+
+    def reset(self, mask: Optional[np.ndarray] = None) -> None:
+        """restarts every bird, or only those selected by `mask`"""
+        idx = np.arange(self.n) if mask is None else np.flatnonzero(mask)
+        count = len(idx)
+
+        self.y[idx] = self.start_y
+        self.vel_y[idx] = -9
+        self.rot[idx] = 80
+        self.flapped[idx] = False
+        self.floor_x[idx] = 0
+        self.frame[idx] = 0
+        self.score[idx] = 0
+        self.done[idx] = False
+        self.crash[idx] = CRASH_NONE
+
+        self.pipe_active[idx] = False
+        self.pipe_x[idx, 0] = self.initial_x
+        self.pipe_x[idx, 1] = self.initial_x + self.initial_spacing
+        self.pipe_gap_y[idx, 0] = self.random_gaps(count)
+        self.pipe_gap_y[idx, 1] = self.random_gaps(count)
+        self.pipe_active[idx, :2] = True
+
+    def step(self, flap: np.ndarray) -> None:
+        """advances every live bird by one frame, same order as Simulation"""
+        live = ~self.done
+
+        # Player.flap
+        flapping = np.asarray(flap, dtype=bool) & live & (self.y > self.min_y)
+        np.copyto(self.vel_y, self.flap_acc, where=flapping)
+        np.copyto(self.rot, 80, where=flapping)
+        self.flapped |= flapping
+
+        # Floor.update
+        floor_x = -((-self.floor_x + self.floor_vel_x) % self.floor_x_extra)
+        np.copyto(self.floor_x, floor_x, where=live)
+
+        self._update_pipes(live)
+
+        # Player.tick_normal
+        accelerate = live & (self.vel_y < self.max_vel_y) & ~self.flapped
+        self.vel_y += accelerate * self.acc_y
+        self.flapped &= ~live
+        y = np.clip(self.y + self.vel_y, self.min_y, self.max_y)
+        np.copyto(self.y, y, where=live)
+        rot = np.clip(self.rot + self.vel_rot, self.rot_min, self.rot_max)
+        np.copyto(self.rot, rot, where=live)
+        self.frame += live
+
+        crash = self._collisions(live)
+        np.copyto(self.crash, crash, where=live)
+        self.done |= crash != CRASH_NONE
+
+        # Player.crossed, only for birds that survived this frame
+        pipe_cx = self.pipe_x + self.pipe_w / 2
+        crossed = (
+            self.pipe_active
+            & (pipe_cx <= self.player_cx)
+            & (self.player_cx < pipe_cx - self.pipe_vel_x)
+        )
+        self.score += crossed.sum(axis=1) * (live & ~self.done)
+
+    def _update_pipes(self, live: np.ndarray) -> None:
+        """Pipes.update: spawn, remove off-screen pairs, then move"""
+        last_x = np.where(self.pipe_active, self.pipe_x, -np.inf).max(axis=1)
+        spawn = np.flatnonzero(live & (last_x < self.spawn_limit))
+        if len(spawn):
+            slot = np.argmin(self.pipe_active[spawn], axis=1)
+            self.pipe_x[spawn, slot] = self.spawn_x
+            self.pipe_gap_y[spawn, slot] = self.random_gaps(len(spawn))
+            self.pipe_active[spawn, slot] = True
+
+        live = live[:, None]
+        self.pipe_active &= ~(live & (self.pipe_x < -self.pipe_w))
+        self.pipe_x += (live & self.pipe_active) * self.pipe_vel_x
+
+    def _collisions(self, live: np.ndarray) -> np.ndarray:
+        """Player.collided: floor first, then any pipe"""
+        player_y = self.y.astype(np.int64)
+
+        # floor, rects truncate their float coordinates like astype does
+        dx = self.floor_x.astype(np.int64) - self.player_x
+        dy = self.floor_y - player_y
+        floor_hit = self._lookup(self.floor_table, dx, dy)
+
+        # pipes, x is shared by the upper and lower pipe of a pair
+        dx = self.pipe_x.astype(np.int64) - self.player_x
+        dy = self.pipe_gap_y.astype(np.int64) - player_y[:, None]
+        pipe_hit = self._lookup(
+            self.upper_table, dx, dy - self.pipe_h
+        ) | self._lookup(self.lower_table, dx, dy + self.pipe_gap)
+        pipe_hit = (pipe_hit & self.pipe_active).any(axis=1)
+
+        crash = np.where(pipe_hit, CRASH_PIPE, CRASH_NONE).astype(np.int8)
+        crash[floor_hit] = CRASH_FLOOR
+        crash[~live] = CRASH_NONE
+        return crash
+
+    def _lookup(
+        self, table: np.ndarray, dx: np.ndarray, dy: np.ndarray
+    ) -> np.ndarray:
+        """reads an _overlap_table, offsets outside of it never overlap"""
+        w, h = table.shape
+        i = dx + (w - self.player_w)
+        j = dy + (h - self.player_h)
+        inside = (i >= 0) & (i < w) & (j >= 0) & (j < h)
+        return table[i.clip(0, w - 1), j.clip(0, h - 1)] & inside
@@ -0,0 +1,286 @@
+"""
+Reset/step environments for training flap policies, in the style of Gym.
+
+`FlappyEnv` wraps one Simulation: the action is 1 to flap and 0 not to,
+the reward is the points Score.add gave during the step, and an episode
+terminates when Player.collided does. Observations are OBS_SIZE float32s:
+
+    player y, player vel_y, then x distance and gap top of the next two
+    pipe pairs, positions scaled by the window size and vel_y by 10
+
+`SharedMemoryVectorEnv` steps K of them in worker processes. Actions,
+observations, rewards and flags live in one shared memory block and a
+barrier hands it back and forth, so a step pickles nothing.
+
+NumPy is an optional dependency, so this module is not imported by
+`src.simulation` itself.
+"""
+
+import multiprocessing
+import os
+import random
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from ..utils import GameConfig
+from .simulation import Simulation
+
+OBS_SIZE = 6
+
+
+class FlappyEnv:
+    """
+    One game, restarted with a seed drawn from its own generator, so the
+    episodes after `reset(seed)` always get the same pipes.
+    """
+
+    def __init__(
+        self,
+        config: Optional[GameConfig] = None,
+        max_steps: Optional[int] = None,
+    ) -> None:
+        self.simulation = Simulation(config)
+        self.max_steps = max_steps
+        self.rng = random.Random()
+        window = self.simulation.config.window
+        self.width = window.width
+        self.height = window.viewport_height
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, dict]:
+        self.start(seed)
+        return self.observe(), {}
+
+    def step(self, action: int) -> Tuple[np.ndarray, float, bool, bool, dict]:
+        """(observation, reward, terminated, truncated, info)"""
+        reward, terminated, truncated = self.act(action)
+        info = {"score": self.simulation.score.score}
+        return self.observe(), reward, terminated, truncated, info
+
+    def start(self, seed: Optional[int] = None) -> None:
+        if seed is not None:
+            self.rng.seed(seed)
+        self.simulation.reset(self.rng.getrandbits(32))
+
+    def act(self, action: int) -> Tuple[float, bool, bool]:
+        """advances one step, (reward, terminated, truncated)"""
+        simulation = self.simulation
+        score = simulation.score.score
+        simulation.advance(bool(action))
+        truncated = (
+            self.max_steps is not None
+            and simulation.frame >= self.max_steps
+            and not simulation.done
+        )
+        return simulation.score.score - score, simulation.done, truncated
+
+    def observe(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """the observation, written into `out` if given"""
+        if out is None:
+            out = np.empty(OBS_SIZE, dtype=np.float32)
+        simulation = self.simulation
+        player = simulation.player
+        out[0] = player.y / self.height
+        out[1] = player.vel_y / 10
+        # pipe pairs still ahead of the player's back, in spawn order
+        ahead = [
+            pipe
+            for pipe in simulation.pipes.lower
+            if pipe.x + pipe.w > player.x
+        ]
+        for i, slot in enumerate((2, 4)):
+            if i < len(ahead):
+                pipe = ahead[i]
+                out[slot] = (pipe.x - player.x) / self.width
+                out[slot + 1] = (
+                    pipe.y - simulation.pipes.pipe_gap
+                ) / self.height
+            else:
+                out[slot] = 1.0
+                out[slot + 1] = 0.5
+        return out
+
+
+# what the workers do next, see SharedMemoryVectorEnv
+STEP = 0
+RESET = 1
+CLOSE = 2
+
+
+def _layout(num_envs: int) -> Dict[str, Tuple[tuple, np.dtype, int]]:
+    """name -> (shape, dtype, offset) of each array in the shared block"""
+    arrays = {
+        "obs": ((num_envs, OBS_SIZE), np.float32),
+        "rewards": ((num_envs,), np.float32),
+        "seeds": ((num_envs,), np.int64),
+        "scores": ((num_envs,), np.int64),
+        "actions": ((num_envs,), np.uint8),
+        "terminated": ((num_envs,), np.bool_),
+        "truncated": ((num_envs,), np.bool_),
+        "command": ((1,), np.int64),
+    }
+    layout = {}
+    offset = 0
+    for name, (shape, dtype) in arrays.items():
+        dtype = np.dtype(dtype)
+        offset = -(-offset // dtype.alignment) * dtype.alignment
+        layout[name] = (shape, dtype, offset)
+        offset += int(np.prod(shape)) * dtype.itemsize
+    return layout
+
+
+def _views(buf, num_envs: int) -> Dict[str, np.ndarray]:
+    return {
+        name: np.ndarray(shape, dtype, buffer=buf, offset=offset)
+        for name, (shape, dtype, offset) in _layout(num_envs).items()
+    }
+
+
+def _size(num_envs: int) -> int:
+    shape, dtype, offset = _layout(num_envs)["command"]
+    return offset + dtype.itemsize
+
+
+def _serve(buf, num_envs, start, stop, max_steps, barrier) -> None:
+    views = _views(buf, num_envs)
+    obs, rewards, scores = views["obs"], views["rewards"], views["scores"]
+    actions, seeds = views["actions"], views["seeds"]
+    terminated, truncated = views["terminated"], views["truncated"]
+    envs = [FlappyEnv(max_steps=max_steps) for _ in range(start, stop)]
+
+    while True:
+        barrier.wait()
+        command = views["command"][0]
+        if command == CLOSE:
+            return
+        for i, env in enumerate(envs, start):
+            if command == RESET:
+                seed = int(seeds[i])
+                env.start(seed if seed >= 0 else None)
+                rewards[i] = 0
+                terminated[i] = truncated[i] = False
+            else:
+                reward, done, cut = env.act(actions[i])
+                rewards[i] = reward
+                terminated[i] = done
+                truncated[i] = cut
+                if done or cut:
+                    # keep the score it ended with, then straight on with
+                    # the next episode
+                    scores[i] = env.simulation.score.score
+                    env.start()
+            env.observe(obs[i])
+        barrier.wait()
+
+
+def _worker(name, *args) -> None:
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        _serve(shm.buf, *args)
+    except BaseException:
+        # wakes the parent instead of leaving it at the barrier forever
+        args[-1].abort()
+        raise
+    # the views are gone with _serve, the block can be let go
+    shm.close()
+
+
+class SharedMemoryVectorEnv:
+    """
+    `num_envs` FlappyEnvs split over `workers` processes, one per core by
+    default. Finished episodes restart on their own: the observation
+    returned for them is the first of the next episode, and `scores` holds
+    the score the last one ended with.
+
+        with SharedMemoryVectorEnv(64) as envs:
+            obs, _ = envs.reset(seed=0)
+            obs, rewards, terminated, truncated, _ = envs.step(actions)
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        workers: Optional[int] = None,
+        max_steps: Optional[int] = None,
+        timeout: Optional[float] = 60,
+    ) -> None:
+        self.num_envs = num_envs
+        workers = min(num_envs, workers or os.cpu_count() or 1)
+        self.timeout = timeout
+        self.shm = shared_memory.SharedMemory(create=True, size=_size(num_envs))
+        views = _views(self.shm.buf, num_envs)
+        self.obs, self.rewards = views["obs"], views["rewards"]
+        self.scores, self.seeds = views["scores"], views["seeds"]
+        self.actions, self.command = views["actions"], views["command"]
+        self.terminated = views["terminated"]
+        self.truncated = views["truncated"]
+
+        # spawned, forking would copy the asset loader's threads and locks
+        context = multiprocessing.get_context("spawn")
+        self.barrier = context.Barrier(workers + 1)
+        bounds = np.linspace(0, num_envs, workers + 1).astype(int)
+        self.processes = [
+            context.Process(
+                target=_worker,
+                args=(self.shm.name, num_envs, start, stop, max_steps)
+                + (self.barrier,),
+                name=f"flappy-env-{i}",
+                daemon=True,
+            )
+            for i, (start, stop) in enumerate(zip(bounds, bounds[1:]))
+        ]
+        for process in self.processes:
+            process.start()
+        self.closed = False
+
+    def run(self, command: int) -> None:
+        self.command[0] = command
+        self.barrier.wait(self.timeout)  # workers go
+        if command != CLOSE:
+            self.barrier.wait(self.timeout)  # workers done
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, dict]:
+        """restarts every env, env i with seed + i when given a seed"""
+        if seed is None:
+            self.seeds[:] = -1
+        else:
+            self.seeds[:] = np.arange(seed, seed + self.num_envs)
+        self.run(RESET)
+        return self.obs.copy(), {}
+
+    def step(
+        self, actions
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+        self.actions[:] = actions
+        self.run(STEP)
+        return (
+            self.obs.copy(),
+            self.rewards.copy(),
+            self.terminated.copy(),
+            self.truncated.copy(),
+            {"scores": self.scores.copy()},
+        )
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.run(CLOSE)
+        except Exception:
+            pass  # a broken barrier, the workers are gone already
+        for process in self.processes:
+            process.join(5)
+            if process.is_alive():
+                process.terminate()
+        del self.obs, self.rewards, self.scores, self.seeds
+        del self.actions, self.command, self.terminated, self.truncated
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> "SharedMemoryVectorEnv":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
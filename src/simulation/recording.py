@@ -0,0 +1,160 @@
+import base64
+import json
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from ..utils import GameConfig
+from ..utils.images import check_variant
+from .simulation import WING_CYCLE, Simulation, SimulationState
+
+RECORDING_VERSION = 1
+
+
+def encode_frames(frames: Iterable[int]) -> bytes:
+    """ascending frame numbers as varint deltas, a byte per flap in practice"""
+    data = bytearray()
+    last = 0
+    for frame in frames:
+        delta = frame - last
+        last = frame
+        while delta >= 0x80:
+            data.append(delta & 0x7F | 0x80)
+            delta >>= 7
+        data.append(delta)
+    return bytes(data)
+
+
+def decode_frames(data: bytes) -> Tuple[int, ...]:
+    frames = []
+    last = delta = shift = 0
+    for byte in data:
+        delta |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            last += delta
+            frames.append(last)
+            delta = shift = 0
+    return tuple(frames)
+
+
+class Recording(NamedTuple):
+    """
+    Everything needed to play a session back: the pipe seed, the sprites,
+    where the splash screen left the player, and the play frames on which
+    the player flapped. `frames` and `score` are what the session ended
+    with, which a replay has to reproduce.
+    """
+
+    seed: int
+    variant: Tuple[int, int, int]
+    player_y: float
+    player_frame: int
+    flaps: Tuple[int, ...]
+    frames: int
+    score: int
+
+    def to_dict(self) -> dict:
+        return {
+            "version": RECORDING_VERSION,
+            "seed": self.seed,
+            "variant": list(self.variant),
+            "player_y": self.player_y,
+            "player_frame": self.player_frame,
+            "flaps": base64.b64encode(encode_frames(self.flaps)).decode(),
+            "frames": self.frames,
+            "score": self.score,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Recording":
+        if data.get("version") != RECORDING_VERSION:
+            raise ValueError(f"not a version {RECORDING_VERSION} recording")
+        return cls(
+            seed=data["seed"],
+            variant=tuple(data["variant"]),
+            player_y=data["player_y"],
+            player_frame=data["player_frame"],
+            flaps=decode_frames(base64.b64decode(data["flaps"])),
+            frames=data["frames"],
+            score=data["score"],
+        )
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+class Recorder:
+    """
+    Collects a Recording while Flappy plays. Frames count updates since play
+    started, the same numbering as Simulation.frame, so a flap on frame n is
+    replayed as the flap flag of step n + 1.
+    """
+
+    def __init__(self, seed: int, variant: Tuple[int, int, int]) -> None:
+        self.seed = seed
+        self.variant = variant
+        self.player_y = 0.0
+        self.player_frame = 0
+        self.flaps: List[int] = []
+
+    def start(self, player) -> None:
+        self.player_y = player.y
+        self.player_frame = player.frame % WING_CYCLE
+        self.flaps = []
+
+    def flap(self, frame: int) -> None:
+        if not self.flaps or self.flaps[-1] != frame:
+            self.flaps.append(frame)
+
+    def finish(self, frames: int, score: int) -> Recording:
+        return Recording(
+            seed=self.seed,
+            variant=self.variant,
+            player_y=self.player_y,
+            player_frame=self.player_frame,
+            flaps=tuple(self.flaps),
+            frames=frames,
+            score=score,
+        )
+
+
+def replay(
+    recording: Recording, config: Optional[GameConfig] = None
+) -> SimulationState:
+    """
+    plays a recording back on the headless simulation as fast as it runs,
+    stopping at the crash or one frame past where the recording ended
+    """
+    variant = check_variant(recording.variant)
+    simulation = Simulation(config)
+    images = simulation.config.images
+    # the config may be shared, its variant goes back once the replay is done
+    previous = images.variant
+    try:
+        if variant != previous:
+            images.randomize(variant)
+        simulation.reset(
+            recording.seed, recording.player_y, recording.player_frame
+        )
+        flaps = set(recording.flaps)
+        while not simulation.done and simulation.frame <= recording.frames:
+            simulation.advance(simulation.frame in flaps)
+        return simulation.state()
+    finally:
+        if images.variant != previous:
+            images.randomize(previous)
+
+
+def verify(recording: Recording, config: Optional[GameConfig] = None) -> bool:
+    """True if replaying reproduces the recorded score and crash frame"""
+    state = replay(recording, config)
+    return (
+        state.done
+        and state.frame == recording.frames
+        and state.score == recording.score
+    )
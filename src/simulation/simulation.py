@@ -0,0 +1,141 @@
+import random
+from typing import NamedTuple, Optional, Tuple
+
+from ..entities import Floor, Pipes, Player, PlayerMode, Score
+from ..utils import GameConfig, Images, Sounds, Window
+from ..utils.constants import ASSETS_DIR
+from ..utils.utils import memoize
+
+# the wing animation repeats every 20 frames, see Player.update_image
+WING_CYCLE = 20
+
+
+class SimulationState(NamedTuple):
+    frame: int
+    score: int
+    done: bool
+    crash_entity: Optional[str]
+    player_y: float
+    player_vel_y: float
+    player_rot: float
+    # (x, gap_y) of every pipe pair on screen, gap_y is the top of the gap
+    pipes: Tuple[Tuple[float, float], ...]
+
+
+def make_headless_config() -> GameConfig:
+    """returns a new display-less config backed by the bundled assets."""
+    return GameConfig(
+        screen=None,
+        clock=None,
+        fps=30,
+        window=Window(288, 512),
+        images=Images(ASSETS_DIR),
+        sounds=Sounds(enabled=False),
+    )
+
+
+@memoize
+def headless_config() -> GameConfig:
+    """the config shared by simulations that aren't given one."""
+    return make_headless_config()
+
+
+class Simulation:
+    """
+    Steps a single game in play mode, one frame per step, without a
+    display or clock. Rendering is optional: with a config that has a
+    screen, `render` draws the current frame on top of the same state.
+    """
+
+    def __init__(self, config: Optional[GameConfig] = None) -> None:
+        self.config = config or headless_config()
+        self.pipes = None
+        self.reset()
+
+    def reset(
+        self,
+        seed: Optional[int] = None,
+        player_y: Optional[float] = None,
+        player_frame: int = 0,
+    ) -> SimulationState:
+        """
+        starts a new game. `seed` fixes the pipe gaps, `player_y` and
+        `player_frame` pick up where the splash screen left the player, as
+        in a Recording.
+        """
+        rng = random.Random(seed) if seed is not None else None
+        self.floor = Floor(self.config)
+        self.player = Player(self.config)
+        if player_y is not None:
+            self.player.y = player_y
+        # wing animation as far along as after that many splash frames
+        for _ in range(player_frame % WING_CYCLE):
+            self.player.update_image()
+        if self.pipes is None:
+            self.pipes = Pipes(self.config, rng)
+        else:
+            # keeps the pipe objects of the last game
+            self.pipes.reset(rng)
+        self.score = Score(self.config)
+        self.frame = 0
+        self.done = False
+        self.player.set_mode(PlayerMode.NORMAL)
+        return self.state()
+
+    def step(self, flap: bool = False) -> SimulationState:
+        """advances one frame, same order as Flappy.play"""
+        self.advance(flap)
+        return self.state()
+
+    def advance(self, flap: bool = False) -> None:
+        """`step` without building the state, for callers that read it less"""
+        if self.done:
+            return
+
+        if flap:
+            self.player.flap()
+
+        self.floor.update()
+        self.pipes.update()
+        self.player.update()
+        self.frame += 1
+
+        if self.player.collided(self.pipes, self.floor):
+            self.done = True
+        else:
+            cx = self.player.cx
+            for pipe, _ in self.pipes.overlapping(cx, cx):
+                if self.player.crossed(pipe):
+                    self.score.add()
+
+    def run(self, flaps) -> SimulationState:
+        """steps once per flap flag until the game ends or flaps run out"""
+        state = self.state()
+        for flap in flaps:
+            state = self.step(flap)
+            if state.done:
+                break
+        return state
+
+    def render(self) -> None:
+        if self.config.screen is None:
+            return
+        self.floor.render()
+        self.pipes.render()
+        self.score.render()
+        self.player.render()
+
+    def state(self) -> SimulationState:
+        return SimulationState(
+            frame=self.frame,
+            score=self.score.score,
+            done=self.done,
+            crash_entity=self.player.crash_entity,
+            player_y=self.player.y,
+            player_vel_y=self.player.vel_y,
+            player_rot=self.player.rot,
+            pipes=tuple(
+                (lower.x, lower.y - self.pipes.pipe_gap)
+                for lower in self.pipes.lower
+            ),
+        )
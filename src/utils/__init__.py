@@ -1,5 +1,9 @@
 from .game_config import GameConfig
+from .hud import Hud, TextCache, get_font, get_text_cache
 from .images import Images
+from .renderer import Renderer
+from .rotation_atlas import RotationAtlas, get_rotation_atlas
 from .sounds import Sounds
+from .timestep import FixedTimestep
 from .utils import clamp, get_hit_mask, pixel_collision
 from .window import Window
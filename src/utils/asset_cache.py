@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from .constants import ASSET_URLS, ASSETS_DIR
+from .endpoints import get_endpoints
+from .utils import memoize
+
+if TYPE_CHECKING:
+    import requests
+
+CACHE_DIR = os.environ.get(
+    "FLAPPY_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "flappybird"),
+)
+# total size of cached objects before the least recently used are evicted
+CACHE_MAX_BYTES = int(os.environ.get("FLAPPY_CACHE_MAX_BYTES", 64 * 2**20))
+# seconds a cached asset is trusted before asking the server again
+CACHE_REVALIDATE_AFTER = float(os.environ.get("FLAPPY_CACHE_REVALIDATE", 3600))
+
+
+class LocalAssets:
+    """Reads assets straight from a directory such as ASSETS_DIR."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def fetch(self, path: str) -> bytes:
+        with open(os.path.join(self.directory, path), "rb") as f:
+            return f.read()
+
+
+class AssetCache:
+    """
+    Content-addressed on-disk cache in front of the asset server.
+
+    Blobs live in `objects/<sha256>` and `index.json` maps each asset path to
+    its blob with the ETag/Last-Modified it was served with. Fresh entries are
+    used without touching the network, stale ones are revalidated with a
+    conditional GET, and when the server can't be reached the cached copy,
+    or failing that the bundled assets directory, is used instead.
+
+    `base_url` may list several servers with the same assets separated by
+    commas. Requests go to the fastest healthy one and move on to the next
+    when it fails, see EndpointPool.
+    """
+
+    def __init__(
+        self,
+        base_url: str = ASSET_URLS,
+        directory: str = CACHE_DIR,
+        max_bytes: int = CACHE_MAX_BYTES,
+        revalidate_after: float = CACHE_REVALIDATE_AFTER,
+        fallback_dir: str = ASSETS_DIR,
+        timeout: float = 5,
+    ) -> None:
+        self.base_url = base_url
+        # one keep-alive connection pool shared by every request
+        self.endpoints = get_endpoints(base_url)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self.fallback = LocalAssets(fallback_dir)
+        self.timeout = timeout
+        self.objects_dir = os.path.join(directory, "objects")
+        self.index_path = os.path.join(directory, "index.json")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.index = self.load_index()
+        # fetch may run on several loader threads at once
+        self.lock = threading.RLock()
+
+    def load_index(self) -> dict:
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_index(self) -> None:
+        with self.lock:
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.index, f)
+            os.replace(tmp_path, self.index_path)
+
+    def fetch(self, path: str) -> bytes:
+        """returns the bytes of an asset, e.g. fetch("sprites/base.png")"""
+        with self.lock:
+            entry = dict(self.index.get(path) or {})
+        data = self.read_object(entry["sha256"]) if entry else None
+        if data is not None:
+            self.touch(path, used=time.time())
+            if time.time() - entry["checked"] < self.revalidate_after:
+                return data
+
+        headers = {}
+        if data is not None and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if data is not None and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.request(path, headers)
+        if response is None:
+            print(f"Could not fetch {path}, using a local copy")
+            if data is not None:
+                return data
+            return self.fallback.fetch(path)
+        if response.status_code == 304 and data is not None:
+            self.touch(path, checked=time.time())
+            self.save_index()
+            return data
+
+        self.store(path, response)
+        return response.content
+
+    def request(self, path: str, headers: dict):
+        """GETs path from the fastest endpoint that answers, or None"""
+        import requests
+
+        for url in self.endpoints.ranked():
+            try:
+                response = self.endpoints.session.get(
+                    f"{url}{path}", headers=headers, timeout=self.timeout
+                )
+            except requests.RequestException as e:
+                print(f"Could not fetch {path} from {url}: {e}")
+                self.endpoints.fail(url)
+                continue
+            if response.status_code >= 500:
+                print(
+                    f"Could not fetch {path} from {url}: {response.status_code}"
+                )
+                self.endpoints.fail(url)
+                continue
+            # it answered, a 4xx only means this endpoint lacks the object
+            self.endpoints.observe(url, response.elapsed.total_seconds())
+            if response.status_code >= 400:
+                print(
+                    f"Could not fetch {path} from {url}: {response.status_code}"
+                )
+                continue
+            return response
+        return None
+
+    def store(self, path: str, response: "requests.Response") -> None:
+        data = response.content
+        sha256 = hashlib.sha256(data).hexdigest()
+        object_path = os.path.join(self.objects_dir, sha256)
+        if not os.path.exists(object_path):
+            tmp_path = f"{object_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, object_path)
+
+        now = time.time()
+        with self.lock:
+            self.index[path] = {
+                "sha256": sha256,
+                "size": len(data),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "checked": now,
+                "used": now,
+            }
+            self.evict()
+            self.save_index()
+
+    def touch(self, path: str, **fields: float) -> None:
+        with self.lock:
+            if path in self.index:
+                self.index[path].update(fields)
+
+    def read_object(self, sha256: str):
+        try:
+            with open(os.path.join(self.objects_dir, sha256), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def evict(self) -> None:
+        """drops least recently used entries until under max_bytes"""
+        sizes = {e["sha256"]: e["size"] for e in self.index.values()}
+        total = sum(sizes.values())
+        by_use = sorted(self.index.items(), key=lambda item: item[1]["used"])
+        for path, entry in by_use:
+            if total <= self.max_bytes:
+                break
+            del self.index[path]
+            sha256 = entry["sha256"]
+            # objects are shared by paths with identical content
+            if all(e["sha256"] != sha256 for e in self.index.values()):
+                total -= sizes[sha256]
+                try:
+                    os.remove(os.path.join(self.objects_dir, sha256))
+                except OSError:
+                    pass
+
+
+@memoize
+def get_assets(base_url: str = ASSET_URLS):
+    """returns the asset source for a URL or directory, shared per base"""
+    if base_url.startswith(("http://", "https://")):
+        return AssetCache(base_url)
+    return LocalAssets(base_url)
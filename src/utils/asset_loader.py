@@ -0,0 +1,102 @@
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, Iterable, Tuple
+
+import pygame
+
+from .asset_cache import get_assets
+from .constants import ASSET_URLS
+from .utils import memoize
+
+SOUND_NAMES = ("die", "hit", "point", "swoosh", "wing")
+
+
+def sound_ext() -> str:
+    return "wav" if "win" in sys.platform else "ogg"
+
+
+def decode(path: str, data: bytes):
+    """
+    decodes sprites to Surfaces and sounds to Sounds. Sounds stay raw bytes
+    until the mixer is up, convert_alpha is left to the main thread.
+    """
+    if path.endswith(".png"):
+        return pygame.image.load(BytesIO(data), path)
+    if pygame.mixer.get_init():
+        return pygame.mixer.Sound(BytesIO(data))
+    return data
+
+
+class AssetLoader:
+    """
+    Fetches and decodes assets on a thread pool. `prefetch` starts a whole
+    manifest at once over the asset source's pooled connection and `get`
+    waits for a single asset, starting it first if nobody asked for it yet.
+    Work is picked up in submission order, so what is needed first should be
+    prefetched first.
+    """
+
+    def __init__(self, base_url: str = ASSET_URLS, workers: int = 8) -> None:
+        self.base_url = base_url
+        # the asset source (and its HTTP stack) is set up by the first load,
+        # on a pool thread, see assets
+        self._assets = None
+        self.assets_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="assets"
+        )
+        self.futures: Dict[str, Future] = {}
+        # path -> (seconds fetching, seconds decoding)
+        self.timings: Dict[str, Tuple[float, float]] = {}
+
+    @property
+    def assets(self):
+        with self.assets_lock:
+            if self._assets is None:
+                self._assets = get_assets(self.base_url)
+            return self._assets
+
+    def prefetch(self, paths: Iterable[str]) -> None:
+        for path in paths:
+            self.submit(path)
+
+    def submit(self, path: str) -> Future:
+        future = self.futures.get(path)
+        if future is None:
+            future = self.executor.submit(self.load, path)
+            self.futures[path] = future
+        return future
+
+    def get(self, path: str):
+        """waits for an asset and hands it over, the loader keeps no copy"""
+        try:
+            return self.submit(path).result()
+        finally:
+            self.futures.pop(path, None)
+
+    def load(self, path: str):
+        start = time.perf_counter()
+        data = self.assets.fetch(path)
+        fetched = time.perf_counter()
+        asset = decode(path, data)
+        self.timings[path] = (fetched - start, time.perf_counter() - fetched)
+        return asset
+
+    def report(self) -> str:
+        """one line per loaded asset, slowest first, times in ms"""
+        lines = [
+            f"{path}: fetch {fetch * 1000:.1f} ms, decode {dec * 1000:.1f} ms"
+            for path, (fetch, dec) in sorted(
+                self.timings.items(), key=lambda item: -sum(item[1])
+            )
+        ]
+        return "\n".join(lines)
+
+
+@memoize
+def get_loader(base_url: str = ASSET_URLS) -> AssetLoader:
+    """returns the loader shared by Images and Sounds for a base URL"""
+    return AssetLoader(base_url)
@@ -0,0 +1,64 @@
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from .constants import ASSETS_DIR
+
+
+class AssetRequestHandler(SimpleHTTPRequestHandler):
+    # keep-alive, like the real asset server
+    protocol_version = "HTTP/1.1"
+
+    def __init__(self, *args, latency: float = 0, **kwargs) -> None:
+        self.latency = latency
+        super().__init__(*args, **kwargs)
+
+    def send_head(self):
+        if self.latency:
+            time.sleep(self.latency)
+        return super().send_head()
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class LocalAssetServer:
+    """
+    Serves a directory over HTTP on localhost as a stand-in for S3, with
+    optional per-request latency:
+
+        with LocalAssetServer(latency=0.05) as base_url:
+            Images(base_url)
+    """
+
+    def __init__(
+        self, directory: str = ASSETS_DIR, port: int = 0, latency: float = 0
+    ) -> None:
+        handler = partial(
+            AssetRequestHandler, directory=directory, latency=latency
+        )
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> str:
+        self.thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> str:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
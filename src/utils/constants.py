@@ -1,7 +1,16 @@
 # constants.py
+import os
 
 # Base URL for S3 assets
 S3_BASE_URL = "https://23202513b.s3.eu-west-1.amazonaws.com/assets/"
+# Comma separated asset servers, e.g. an edge cache in front of S3, the
+# fastest healthy one is used, see EndpointPool
+ASSET_URLS = os.environ.get("FLAPPY_ASSET_URLS", S3_BASE_URL)
+
+# Bundled copy of the same assets, used by headless runs
+ASSETS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "assets", ""
+)
 
 # List of all possible players (tuple of 3 positions of flap)
 PLAYERS = (
@@ -0,0 +1,168 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .utils import memoize
+
+
+class Endpoint:
+    def __init__(self, url: str) -> None:
+        self.url = url
+        # smoothed seconds to first response byte, None until measured
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.down_until = 0.0
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.down_until
+
+
+class EndpointPool:
+    """
+    Candidate base URLs for the same content, e.g. an edge cache and the S3
+    origin, ranked by measured latency. Every request and a background probe
+    over one persistent session feed an EWMA of each endpoint's latency.
+    After `max_failures` failures in a row an endpoint sits out `cooldown`
+    seconds, skipped by `ranked` until the cooldown ends or a probe finds
+    it back up.
+
+        pool = EndpointPool(["http://edge.local:8080/", S3_BASE_URL])
+        for url in pool.ranked():
+            ...
+            pool.observe(url, seconds)  # or pool.fail(url)
+
+    Endpoints that were never measured keep the order they were given in,
+    after the measured ones. While every endpoint is cooling down `ranked`
+    is empty, callers fall back on what they have, e.g. local assets.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        alpha: float = 0.3,
+        max_failures: int = 3,
+        cooldown: float = 30,
+        probe_interval: float = 10,
+        timeout: float = 2,
+        pool_size: int = 8,
+    ) -> None:
+        self.endpoints: Dict[str, Endpoint] = {
+            url: Endpoint(url) for url in urls
+        }
+        self.alpha = alpha
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.probe_interval = probe_interval
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.lock = threading.Lock()
+        self.thread = None
+        self._session = None
+        self.session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        one keep-alive connection pool per host, shared by every request,
+        made on first use, usually on the probe thread
+        """
+        with self.session_lock:
+            if self._session is None:
+                # imported here, a game on local assets never needs it
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                self._session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=len(self.endpoints),
+                    pool_maxsize=self.pool_size,
+                )
+                self._session.mount("http://", adapter)
+                self._session.mount("https://", adapter)
+            return self._session
+
+    def ranked(self) -> List[str]:
+        """healthy endpoints fastest first, the ones cooling down left out"""
+        now = time.monotonic()
+        order = list(self.endpoints)
+        with self.lock:
+            return sorted(
+                (url for url in order if self.endpoints[url].healthy(now)),
+                key=lambda url: (
+                    self.endpoints[url].latency is None,
+                    self.endpoints[url].latency or 0,
+                    order.index(url),
+                ),
+            )
+
+    def best(self) -> Optional[str]:
+        ranked = self.ranked()
+        return ranked[0] if ranked else None
+
+    def observe(self, url: str, seconds: float) -> None:
+        with self.lock:
+            endpoint = self.endpoints[url]
+            if endpoint.latency is None:
+                endpoint.latency = seconds
+            else:
+                endpoint.latency += self.alpha * (seconds - endpoint.latency)
+            endpoint.failures = 0
+            endpoint.down_until = 0.0
+
+    def fail(self, url: str) -> None:
+        with self.lock:
+            endpoint = self.endpoints[url]
+            endpoint.failures += 1
+            if endpoint.failures >= self.max_failures:
+                endpoint.down_until = time.monotonic() + self.cooldown
+
+    def latencies(self) -> Dict[str, Optional[float]]:
+        """url -> smoothed latency in seconds, None if down or unmeasured"""
+        now = time.monotonic()
+        with self.lock:
+            return {
+                url: e.latency if e.healthy(now) else None
+                for url, e in self.endpoints.items()
+            }
+
+    def probe(self) -> None:
+        """measures every endpoint once, slow ones don't hold up the game"""
+        import requests
+
+        for url in self.endpoints:
+            try:
+                response = self.session.head(url, timeout=self.timeout)
+            except requests.RequestException:
+                self.fail(url)
+                continue
+            # any answer short of a server error means it is reachable
+            if response.status_code >= 500:
+                self.fail(url)
+            else:
+                self.observe(url, response.elapsed.total_seconds())
+
+    def start(self) -> None:
+        """probes now and then every probe_interval on a daemon thread"""
+        if self.thread is None:
+            self.thread = threading.Thread(
+                target=self.run, name="endpoints", daemon=True
+            )
+            self.thread.start()
+
+    def run(self) -> None:
+        while True:
+            self.probe()
+            time.sleep(self.probe_interval)
+
+
+def split_urls(urls: str) -> List[str]:
+    """splits "http://a/,http://b/" into its URLs"""
+    return [url.strip() for url in urls.split(",") if url.strip()]
+
+
+@memoize
+def get_endpoints(urls: str) -> EndpointPool:
+    """returns the shared, probing pool for a comma separated URL list"""
+    pool = EndpointPool(split_urls(urls))
+    pool.start()
+    return pool
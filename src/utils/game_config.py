@@ -1,8 +1,10 @@
 import os
+from typing import Optional
 
 import pygame
 
 from .images import Images
+from .renderer import Renderer
 from .sounds import Sounds
 from .window import Window
 
@@ -10,20 +12,25 @@ from .window import Window
 class GameConfig:
     def __init__(
         self,
-        screen: pygame.Surface,
-        clock: pygame.time.Clock,
+        screen: Optional[pygame.Surface],
+        clock: Optional[pygame.time.Clock],
         fps: int,
         window: Window,
         images: Images,
         sounds: Sounds,
     ) -> None:
         self.screen = screen
+        # Only changed areas of the screen are pushed, see Renderer
+        self.renderer = Renderer(screen) if screen is not None else None
         self.clock = clock
+        # physics steps a second, see FixedTimestep
         self.fps = fps
+        # cap on rendered frames a second, 0 renders as fast as possible
+        self.max_fps = int(os.environ.get("FLAPPY_MAX_FPS", 0))
         self.window = window
         self.images = images
         self.sounds = sounds
         self.debug = os.environ.get("DEBUG", False)
 
     def tick(self) -> None:
-        self.clock.tick(self.fps)
+        self.clock.tick(self.max_fps)
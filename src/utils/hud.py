@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+import pygame
+
+from .renderer import Renderer
+from .utils import memoize
+
+Color = Tuple[int, int, int]
+
+
+@memoize
+def get_font(name: str, size: int, bold: bool = False) -> pygame.font.Font:
+    """returns a system font, looked up once per (name, size, bold)."""
+    return pygame.font.SysFont(name, size, bold)
+
+
+class TextCache:
+    """Rendered strings keyed by (font, text, color), least recently used
+    ones are dropped past `max_entries`."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def render(
+        self, font: pygame.font.Font, text: str, color: Color
+    ) -> pygame.Surface:
+        key = (font, text, color)
+        surface = self.entries.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self.entries[key] = surface
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(key)
+        return surface
+
+
+@memoize
+def get_text_cache() -> TextCache:
+    """returns the text cache shared by the HUD and debug overlays."""
+    return TextCache()
+
+
+class Hud:
+    """
+    Named lines of text composited into a single overlay. Setting a line to
+    the text it already shows is free, the overlay is only rebuilt when some
+    line actually changed and is drawn with one blit per frame.
+    """
+
+    def __init__(
+        self,
+        renderer: Renderer,
+        font: pygame.font.Font,
+        color: Color = (255, 255, 255),
+    ) -> None:
+        self.renderer = renderer
+        self.font = font
+        self.color = color
+        self.text_cache = get_text_cache()
+        self.lines: Dict[str, Tuple[str, Tuple[int, int]]] = {}
+        self.overlay = None
+        self.overlay_pos = (0, 0)
+
+    def set(self, key: str, text: str, pos: Tuple[int, int]) -> None:
+        if self.lines.get(key) != (text, pos):
+            self.lines[key] = (text, pos)
+            self.overlay = None
+
+    def remove(self, key: str) -> None:
+        if self.lines.pop(key, None) is not None:
+            self.overlay = None
+
+    def build(self) -> None:
+        surfaces = []
+        rects = []
+        for text, pos in self.lines.values():
+            surface = self.text_cache.render(self.font, text, self.color)
+            surfaces.append(surface)
+            rects.append(surface.get_rect(topleft=pos))
+        bounds = rects[0].unionall(rects[1:])
+        self.overlay = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        for surface, rect in zip(surfaces, rects):
+            self.overlay.blit(surface, rect.move(-bounds.x, -bounds.y))
+        self.overlay_pos = bounds.topleft
+
+    def draw(self) -> None:
+        if not self.lines:
+            return
+        if self.overlay is None:
+            self.build()
+        self.renderer.blit(self.overlay, self.overlay_pos)
@@ -1,64 +1,170 @@
 import random
+from collections import OrderedDict
 from typing import List, Tuple
+
 import pygame
-import requests
-from io import BytesIO
-from .constants import BACKGROUNDS, PIPES, PLAYERS, S3_BASE_URL
+
+from .asset_loader import get_loader
+from .constants import ASSET_URLS, BACKGROUNDS, PIPES, PLAYERS
+from .sprite_bundle import flipped_name, get_bundle
+from .utils import prime_hit_mask
+
+NUMBERS = tuple(f"sprites/{num}.png" for num in range(10))
+
+
+def check_variant(variant) -> Tuple[int, int, int]:
+    """variant as a tuple, ValueError unless it picks an existing background, player, and pipe"""
+    sprites = (BACKGROUNDS, PLAYERS, PIPES)
+    if not isinstance(variant, (tuple, list)) or len(variant) != len(sprites):
+        raise ValueError(f"not a sprite variant: {variant!r}")
+    for index, paths in zip(variant, sprites):
+        # bools are ints too, but never a sprite index
+        if type(index) is not int or not 0 <= index < len(paths):
+            raise ValueError(f"not a sprite variant: {variant!r}")
+    return tuple(variant)
+
 
 class Images:
-    def __init__(self) -> None:
-        # Load number sprites from S3
-        self.numbers = [
-            self.load_image_from_url(f"{S3_BASE_URL}sprites/{num}.png")
-            for num in range(10)
-        ]
+    def __init__(self, base_url: str = ASSET_URLS, max_variants: int = 32) -> None:
+        # S3 by default, or a local directory such as ASSETS_DIR
+        self.base_url = base_url
+        self.loader = get_loader(base_url)
+        # Pre-decoded sprites from `python -m src.bundle`, if built
+        self.bundle = get_bundle()
+
+        # Decoded sprites by (path, flipped), oldest dropped past max_variants
+        self.variants = OrderedDict()
+        self.max_variants = max_variants
+
+        # Sprites are decoded when first used, so building Images never
+        # waits on a download and the first frame can go up right away
+        self._welcome_message = None
+        self._base = None
+        self._numbers = None
+        self._game_over = None
+
+        # Pick sprites first so their downloads jump the queue
+        self.variant = self.pick_variant()
+        rand_bg, rand_player, rand_pipe = self.variant
+        self.prefetch(
+            ["sprites/message.png", "sprites/base.png", BACKGROUNDS[rand_bg], *PLAYERS[rand_player]]
+        )
+        self.prefetch([PIPES[rand_pipe], *NUMBERS, "sprites/gameover.png"])
+        # Other variants last, ready for later rounds
+        self.prefetch([*BACKGROUNDS, *PIPES, *(path for player in PLAYERS for path in player)])
+
+        # The picked background, player, and pipe sprites
+        self.randomize(self.variant)
 
-        # Load game over sprite
-        self.game_over = self.load_image_from_url(f"{S3_BASE_URL}sprites/gameover.png")
+    @property
+    def welcome_message(self) -> pygame.Surface:
+        if self._welcome_message is None:
+            self._welcome_message = self.load_image("sprites/message.png")
+        return self._welcome_message
 
-        # Load welcome message sprite
-        self.welcome_message = self.load_image_from_url(f"{S3_BASE_URL}sprites/message.png")
+    @property
+    def base(self) -> pygame.Surface:
+        if self._base is None:
+            self._base = self.load_image("sprites/base.png")
+        return self._base
 
-        # Load base (ground) sprite
-        self.base = self.load_image_from_url(f"{S3_BASE_URL}sprites/base.png")
+    @property
+    def numbers(self) -> List[pygame.Surface]:
+        # Only the score uses these, load on first use
+        if self._numbers is None:
+            self._numbers = [self.load_image(path) for path in NUMBERS]
+        return self._numbers
 
-        # Randomize other sprites (background, player, pipe)
-        self.randomize()
+    @property
+    def game_over(self) -> pygame.Surface:
+        if self._game_over is None:
+            self._game_over = self.load_image("sprites/gameover.png")
+        return self._game_over
 
-    def load_image_from_url(self, url: str) -> pygame.Surface:
+    @property
+    def background(self) -> pygame.Surface:
+        if self._background is None:
+            self._background = self.load_image(BACKGROUNDS[self.variant[0]])
+        return self._background
+
+    @property
+    def player(self) -> Tuple[pygame.Surface, ...]:
+        if self._player is None:
+            self._player = tuple(self.load_image(path) for path in PLAYERS[self.variant[1]])
+        return self._player
+
+    @property
+    def pipe(self) -> Tuple[pygame.Surface, pygame.Surface]:
+        if self._pipe is None:
+            # The upper pipe is the flipped one
+            path = PIPES[self.variant[2]]
+            pipe_surface = self.load_image(path)
+            if pipe_surface is not None:
+                self._pipe = (self.load_image(path, flipped=True), pipe_surface)
+            else:
+                self._pipe = (None, None)
+        return self._pipe
+
+    def prefetch(self, paths: List[str]) -> None:
+        # Sprites in the bundle need no download
+        self.loader.prefetch(path for path in paths if not self.in_bundle(path))
+
+    def in_bundle(self, name: str) -> bool:
+        return self.bundle is not None and name in self.bundle
+
+    def load_image(self, path: str, flipped: bool = False) -> pygame.Surface:
+        key = (path, flipped)
+        image = self.variants.get(key)
+        if image is not None:
+            self.variants.move_to_end(key)
+            return image
+
+        name = flipped_name(path) if flipped else path
+        if self.in_bundle(name):
+            # Mapped straight from the bundle along with its hit mask
+            image = self.bundle.surface(name)
+            if pygame.display.get_surface() is not None:
+                # RGBA as stored, in the display's format blits skip a conversion
+                image = image.convert_alpha()
+            prime_hit_mask(image, self.bundle.hit_mask(name))
+        elif flipped:
+            image = self.load_image(path)
+            image = image and pygame.transform.flip(image, False, True)
+        else:
+            image = self.decode_image(path)
+        if image is not None:
+            self.variants[key] = image
+            if len(self.variants) > self.max_variants:
+                self.variants.popitem(last=False)
+        return image
+
+    def decode_image(self, path: str) -> pygame.Surface:
         try:
-            response = requests.get(url)
-            response.raise_for_status()  # Raise an error for bad responses
-            image_data = BytesIO(response.content)
-            return pygame.image.load(image_data).convert_alpha()  # Load the image from byte data
-        except requests.HTTPError as e:
-            print(f"HTTP error occurred: {e}")
+            # Fetched and decoded on the loader's pool, see AssetLoader
+            image = self.loader.get(path)
+            if pygame.display.get_surface() is None:
+                # convert_alpha needs a display, copy onto a per-pixel alpha
+                # surface instead so colorkeyed sprites get the same hit masks
+                surface = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+                surface.blit(image, (0, 0))
+                return surface
+            return image.convert_alpha()
         except Exception as e:
-            print(f"An error occurred while loading image from {url}: {e}")
+            print(f"An error occurred while loading image {path}: {e}")
         return None  # Return None if there was an error
 
-    def randomize(self):
+    def pick_variant(self) -> Tuple[int, int, int]:
         # Select random background, player, and pipe sprites
         rand_bg = random.randint(0, len(BACKGROUNDS) - 1)
         rand_player = random.randint(0, len(PLAYERS) - 1)
         rand_pipe = random.randint(0, len(PIPES) - 1)
+        return rand_bg, rand_player, rand_pipe
 
-        # Load background from S3
-        self.background = self.load_image_from_url(f"{S3_BASE_URL}{BACKGROUNDS[rand_bg]}")
+    def randomize(self, variant: Tuple[int, int, int] = None):
+        # Decoded variants stay cached, so switching between rounds is free
+        self.variant = self.pick_variant() if variant is None else check_variant(variant)
 
-        # Load player sprites from S3
-        self.player = (
-            self.load_image_from_url(f"{S3_BASE_URL}{PLAYERS[rand_player][0]}"),
-            self.load_image_from_url(f"{S3_BASE_URL}{PLAYERS[rand_player][1]}"),
-            self.load_image_from_url(f"{S3_BASE_URL}{PLAYERS[rand_player][2]}"),
-        )
-
-        # Load pipe sprites from S3 and apply transformation for flipping
-        pipe_surface = self.load_image_from_url(f"{S3_BASE_URL}{PIPES[rand_pipe]}")
-        if pipe_surface is not None:
-            self.pipe = (
-                pygame.transform.flip(pipe_surface, False, True),
-                pipe_surface,
-            )
-        else:
-            self.pipe = (None, None)
\ No newline at end of file
+        # Background, player, and pipe sprites load again on next use
+        self._background = None
+        self._player = None
+        self._pipe = None
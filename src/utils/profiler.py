@@ -0,0 +1,164 @@
+import json
+import os
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List
+
+# histogram bucket upper bounds in ms, the last one catches the rest
+PHASE_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 33, 66, float("inf"))
+
+
+class Phase:
+    """Times one named phase, reused for every frame."""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "FrameProfiler", name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc) -> None:
+        self.profiler.add(self.name, self.start, time.perf_counter_ns())
+
+
+class FrameProfiler:
+    """
+    Times the phases of each frame and writes them as a Chrome trace, which
+    chrome://tracing and Perfetto open, plus per-phase summary histograms:
+
+        with profiler.phase("events"):
+            events = pygame.event.get()
+        ...
+        profiler.frame()
+
+    Phases may nest. `close` writes the trace to `path`, e.g. trace.json,
+    and the summary next to it as trace.summary.json.
+    """
+
+    def __init__(self, path: str, fps: int = 30) -> None:
+        self.path = path
+        self.budget_ms = 1000 / fps
+        self.origin = time.perf_counter_ns()
+        self.frame_start = self.origin
+        self.frames = 0
+        self.phases: Dict[str, Phase] = {}
+        # trace events as flat (name, start ns, end ns) triples
+        self.events = array("q")
+        self.names: List[str] = []
+        self.name_ids: Dict[str, int] = {}
+        self.durations = defaultdict(lambda: array("d"))
+
+    def phase(self, name: str) -> Phase:
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = Phase(self, name)
+        return phase
+
+    def add(self, name: str, start: int, end: int) -> None:
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = self.name_ids[name] = len(self.names)
+            self.names.append(name)
+        self.events.extend((name_id, start, end))
+        self.durations[name].append((end - start) / 1e6)
+
+    def frame(self) -> None:
+        """closes the current frame, call once per loop iteration"""
+        now = time.perf_counter_ns()
+        self.add("frame", self.frame_start, now)
+        self.frame_start = now
+        self.frames += 1
+
+    def trace(self) -> dict:
+        pid = os.getpid()
+        events = [
+            {
+                "name": self.names[self.events[i]],
+                "ph": "X",
+                "ts": (self.events[i + 1] - self.origin) / 1000,
+                "dur": (self.events[i + 2] - self.events[i + 1]) / 1000,
+                "pid": pid,
+                # frames on their own row above the phases
+                "tid": 0 if self.names[self.events[i]] == "frame" else 1,
+            }
+            for i in range(0, len(self.events), 3)
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def summary(self) -> dict:
+        """count, mean, percentiles and a histogram per phase, times in ms"""
+        summary = {}
+        for name, durations in self.durations.items():
+            ordered = sorted(durations)
+            n = len(ordered)
+            counts = [0] * len(PHASE_BUCKETS)
+            for duration in ordered:
+                counts[bisect_left(PHASE_BUCKETS, duration)] += 1
+            mean = sum(ordered) / n
+            summary[name] = {
+                "count": n,
+                "mean": mean,
+                "p50": ordered[int(0.5 * (n - 1))],
+                "p95": ordered[int(0.95 * (n - 1))],
+                "p99": ordered[int(0.99 * (n - 1))],
+                "max": ordered[-1],
+                "budget_share": mean / self.budget_ms,
+                "histogram": dict(zip(map(str, PHASE_BUCKETS), counts)),
+            }
+        return summary
+
+    def report(self) -> str:
+        """the summary as a table, slowest phases first"""
+        summary = self.summary()
+        lines = [
+            f"{'phase':<20}{'count':>7}{'mean':>8}{'p50':>8}{'p95':>8}"
+            f"{'p99':>8}{'max':>8}{'budget':>8}"
+        ]
+        for name, s in sorted(
+            summary.items(), key=lambda item: -item[1]["mean"]
+        ):
+            lines.append(
+                f"{name:<20}{s['count']:>7}{s['mean']:>8.2f}{s['p50']:>8.2f}"
+                f"{s['p95']:>8.2f}{s['p99']:>8.2f}{s['max']:>8.2f}"
+                f"{s['budget_share']:>8.1%}"
+            )
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        with open(self.path, "w") as f:
+            json.dump(self.trace(), f)
+        with open(f"{os.path.splitext(self.path)[0]}.summary.json", "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        print(f"{self.frames} frames profiled, trace written to {self.path}")
+        print(self.report())
+
+
+class NullPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+class NullProfiler:
+    """Stands in for FrameProfiler when profiling is off, costs a call."""
+
+    null_phase = NullPhase()
+
+    def phase(self, name: str) -> NullPhase:
+        return self.null_phase
+
+    def frame(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,54 @@
+from typing import List, Optional
+
+import pygame
+
+
+class Renderer:
+    """
+    Draws onto the screen while recording every rect it touches, so a frame
+    only pushes those areas to the display. The background is kept as is:
+    each frame starts by painting it back over the rects of the frame before.
+    """
+
+    def __init__(self, screen: pygame.Surface) -> None:
+        self.screen = screen
+        self.background: Optional[pygame.Surface] = None
+        self.dirty: List[pygame.Rect] = []
+        self.previous: List[pygame.Rect] = []
+        self.full = True
+
+    def invalidate(self) -> None:
+        """redraw and present the whole screen on the next frame"""
+        self.full = True
+
+    def draw_background(self, image: pygame.Surface) -> None:
+        if image is not self.background:
+            self.background = image
+            self.full = True
+
+        if self.full:
+            self.screen.blit(image, (0, 0))
+        else:
+            for rect in self.previous:
+                self.screen.blit(image, rect, rect)
+
+    def blit(
+        self, image: pygame.Surface, dest, area: pygame.Rect = None
+    ) -> pygame.Rect:
+        rect = self.screen.blit(image, dest, area)
+        self.dirty.append(rect)
+        return rect
+
+    def mark(self, rect: pygame.Rect) -> None:
+        """records an area drawn without blit, e.g. by pygame.draw"""
+        self.dirty.append(rect)
+
+    def present(self) -> None:
+        if self.full:
+            pygame.display.update()
+        else:
+            # last frame's rects were repainted with the background
+            pygame.display.update(self.previous + self.dirty)
+        self.previous = self.dirty
+        self.dirty = []
+        self.full = False
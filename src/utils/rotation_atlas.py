@@ -0,0 +1,57 @@
+from collections import OrderedDict
+from typing import List, Sequence, Tuple
+
+import pygame
+
+from .utils import HitMaskType, build_hit_mask, memoize
+
+# Player.rot never leaves this range, see Player.flap and Player.rotate
+ROTATION_RANGE = range(-90, 81)
+
+
+class RotationAtlas:
+    """
+    Rotated copies of a set of animation frames keyed by (frame, whole
+    degrees). Entries are built on first use and the least recently used
+    ones are dropped past `max_entries`. Their hit masks are only built
+    when asked for, drawing never needs them.
+    """
+
+    def __init__(
+        self,
+        frames: Sequence[pygame.Surface],
+        max_entries: int = None,
+    ) -> None:
+        self.frames = tuple(frames)
+        # enough for every frame at every angle the player can reach
+        self.max_entries = max_entries or len(frames) * len(ROTATION_RANGE)
+        # key -> [rotated image, its hit mask or None until asked for]
+        self.entries = OrderedDict()
+
+    def get(self, frame: int, angle: float) -> pygame.Surface:
+        return self.entry(frame, angle)[0]
+
+    def hit_mask(self, frame: int, angle: float) -> HitMaskType:
+        entry = self.entry(frame, angle)
+        if entry[1] is None:
+            entry[1] = build_hit_mask(entry[0])
+        return entry[1]
+
+    def entry(self, frame: int, angle: float) -> List:
+        key = (frame, round(angle))
+        entry = self.entries.get(key)
+        if entry is None:
+            image = pygame.transform.rotate(self.frames[frame], key[1])
+            entry = [image, None]
+            self.entries[key] = entry
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(key)
+        return entry
+
+
+@memoize
+def get_rotation_atlas(frames: Tuple[pygame.Surface, ...]) -> RotationAtlas:
+    """returns the shared atlas of a set of frames, one per sprite set."""
+    return RotationAtlas(frames)
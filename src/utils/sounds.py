@@ -1,8 +1,7 @@
-import sys
 import pygame
-import requests
 from io import BytesIO
-from .constants import S3_BASE_URL  # Import the base URL from your constants
+from .asset_loader import SOUND_NAMES, get_loader, sound_ext
+from .constants import ASSET_URLS  # Import the asset servers from your constants
 
 class Sounds:
     die: pygame.mixer.Sound
@@ -11,31 +10,42 @@ class Sounds:
     swoosh: pygame.mixer.Sound
     wing: pygame.mixer.Sound
 
-    def __init__(self) -> None:
-        # Initialize the mixer
-        pygame.mixer.init()
+    def __init__(self, enabled: bool = True, base_url: str = ASSET_URLS) -> None:
+        if not enabled:
+            # Silent set for headless runs, play_sound skips missing sounds
+            self.die = self.hit = self.point = self.swoosh = self.wing = None
+            return
+
+        self.loader = get_loader(base_url)
+
+        # The mixer is started by the game once the first frame is up, or
+        # by the first sound loaded before then, see load_sound
 
         # Determine the audio file extension based on the platform
-        ext = "wav" if "win" in sys.platform else "ogg"
+        self.ext = sound_ext()
+
+        # Start downloading now, each sound is loaded when first played
+        self.loader.prefetch(f"audio/{name}.{self.ext}" for name in SOUND_NAMES)
 
-        # Load sounds from S3 using the base URL
-        self.die = self.load_sound(f"{S3_BASE_URL}audio/die.{ext}")
-        self.hit = self.load_sound(f"{S3_BASE_URL}audio/hit.{ext}")
-        self.point = self.load_sound(f"{S3_BASE_URL}audio/point.{ext}")
-        self.swoosh = self.load_sound(f"{S3_BASE_URL}audio/swoosh.{ext}")
-        self.wing = self.load_sound(f"{S3_BASE_URL}audio/wing.{ext}")
+    def __getattr__(self, name: str) -> pygame.mixer.Sound:
+        # Only called for sounds that haven't been loaded yet
+        if name not in SOUND_NAMES:
+            raise AttributeError(name)
+        sound = self.load_sound(f"audio/{name}.{self.ext}")
+        setattr(self, name, sound)
+        return sound
 
-    def load_sound(self, url: str) -> pygame.mixer.Sound:
-        """Load a sound file from a URL with error handling."""
+    def load_sound(self, path: str) -> pygame.mixer.Sound:
+        """Load a sound file through the asset loader with error handling."""
         try:
-            response = requests.get(url)
-            response.raise_for_status()  # Raise an error for bad responses
-            sound_data = BytesIO(response.content)  # Create a byte stream from the response content
-            return pygame.mixer.Sound(sound_data)  # Load the sound from byte data
-        except requests.HTTPError as e:
-            print(f"HTTP error occurred: {e}")
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            sound = self.loader.get(path)  # Decoded on the loader's pool when the mixer was up
+            if isinstance(sound, bytes):
+                sound = pygame.mixer.Sound(BytesIO(sound))  # Load the sound from byte data
+            return sound
         except Exception as e:
-            print(f"An error occurred while loading sound from {url}: {e}")
+            print(f"An error occurred while loading sound {path}: {e}")
         return None  # Return None if loading fails
 
     def play_sound(self, sound: pygame.mixer.Sound):
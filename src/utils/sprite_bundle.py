@@ -0,0 +1,143 @@
+"""
+Packed sprite bundle: every sprite pre-decoded to RGBA, the flipped pipes,
+and a hit mask plane per sprite, in one file that is mapped with mmap.
+
+    python -m src.bundle [output]
+
+Layout: a 16 byte header (magic, version, index length, reserved), a JSON
+index of {path: [width, height, pixels offset, mask offset]}, then the
+pixel and mask data. Pixels are RGBA rows, masks one byte per pixel.
+"""
+
+import glob
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, Optional
+
+import pygame
+
+from .constants import ASSETS_DIR, PIPES
+from .utils import memoize
+
+BUNDLE_MAGIC = b"FLPB"
+BUNDLE_VERSION = 1
+BUNDLE_HEADER = struct.Struct("<4sIII")
+BUNDLE_PATH = os.environ.get(
+    "FLAPPY_BUNDLE", os.path.join(ASSETS_DIR, "sprites.bundle")
+)
+# data blocks start on cache line boundaries
+ALIGN = 64
+
+
+def flipped_name(path: str) -> str:
+    return f"{path}#flipped"
+
+
+def sprite_paths(assets_dir: str = ASSETS_DIR) -> Iterable[str]:
+    for file in sorted(glob.glob(os.path.join(assets_dir, "sprites", "*.png"))):
+        yield f"sprites/{os.path.basename(file)}"
+
+
+def build_bundle(
+    output: str = BUNDLE_PATH, assets_dir: str = ASSETS_DIR
+) -> None:
+    """decodes every sprite under assets_dir once and writes the bundle"""
+    surfaces: Dict[str, pygame.Surface] = {}
+    for path in sprite_paths(assets_dir):
+        image = pygame.image.load(os.path.join(assets_dir, path))
+        # same per-pixel alpha conversion the game applies, see Images
+        surface = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+        surface.blit(image, (0, 0))
+        surfaces[path] = surface
+    for path in PIPES:
+        surfaces[flipped_name(path)] = pygame.transform.flip(
+            surfaces[path], False, True
+        )
+
+    blocks = []
+    index = {}
+    offset = 0
+    for name, surface in surfaces.items():
+        w, h = surface.get_size()
+        pixels = pygame.image.tobytes(surface, "RGBA")
+        # alpha is every fourth byte, same test as get_hit_mask
+        mask = bytes(1 if a else 0 for a in pixels[3::4])
+        index[name] = [w, h, offset, offset + _aligned(len(pixels))]
+        blocks += [pixels, mask]
+        offset += _aligned(len(pixels)) + _aligned(len(mask))
+
+    header = json.dumps(index).encode()
+    data_start = _aligned(BUNDLE_HEADER.size + len(header))
+    tmp_path = f"{output}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(
+            BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(header), 0)
+        )
+        f.write(header)
+        f.write(b"\0" * (data_start - f.tell()))
+        for block in blocks:
+            f.write(block)
+            f.write(b"\0" * (_aligned(len(block)) - len(block)))
+    os.replace(tmp_path, output)
+
+
+def _aligned(size: int) -> int:
+    return -(-size // ALIGN) * ALIGN
+
+
+class SpriteBundle:
+    """
+    Read side of a bundle. Surfaces wrap the mapped pages directly, so
+    nothing is decoded and processes mapping the same file share memory.
+    The mapping is copy-on-write to keep stray writes out of the file.
+    """
+
+    def __init__(self, path: str = BUNDLE_PATH) -> None:
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, index_len, _ = BUNDLE_HEADER.unpack_from(self.map)
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+            raise ValueError(f"{path} is not a version {BUNDLE_VERSION} bundle")
+        start = BUNDLE_HEADER.size
+        self.index = json.loads(self.map[start : start + index_len])
+        self.data_start = _aligned(start + index_len)
+        self.view = memoryview(self.map)
+        self.surfaces: Dict[str, pygame.Surface] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def surface(self, name: str) -> pygame.Surface:
+        surface = self.surfaces.get(name)
+        if surface is None:
+            w, h, pixels, _ = self.index[name]
+            start = self.data_start + pixels
+            surface = pygame.image.frombuffer(
+                self.view[start : start + w * h * 4], (w, h), "RGBA"
+            )
+            self.surfaces[name] = surface
+        return surface
+
+    def hit_mask(self, name: str) -> pygame.mask.Mask:
+        """the stored mask plane as a pygame Mask, one pass in C"""
+        w, h, _, mask = self.index[name]
+        start = self.data_start + mask
+        plane = pygame.image.frombuffer(
+            self.view[start : start + w * h], (w, h), "P"
+        )
+        plane.set_colorkey(0)
+        return pygame.mask.from_surface(plane)
+
+
+@memoize
+def get_bundle(path: str = BUNDLE_PATH) -> Optional[SpriteBundle]:
+    """returns the shared bundle, or None if it hasn't been built"""
+    if not os.path.exists(path):
+        return None
+    try:
+        return SpriteBundle(path)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring sprite bundle {path}: {e}")
+        return None
@@ -0,0 +1,187 @@
+import threading
+import time
+from array import array
+from typing import List, Optional, Tuple
+
+from .endpoints import EndpointPool
+
+# frame time buckets in seconds, dense around the 33 ms budget at 30 fps
+FRAME_BUCKETS = (
+    0.005, 0.01, 0.02, 0.03, 0.034, 0.04, 0.05, 0.067, 0.1, 0.25, 0.5, 1
+)  # fmt: skip
+
+
+class FrameRing:
+    """
+    Fixed size ring of frame samples with a single writer, the game loop,
+    and a single reader, the collector thread. The writer stores into
+    preallocated arrays and bumps a counter, so recording takes no lock and
+    allocates nothing. The reader only looks at slots below the counter it
+    read, and counts samples that were overwritten before it got to them.
+    """
+
+    def __init__(self, capacity: int = 4096) -> None:
+        self.capacity = capacity
+        # seconds between frames, and seconds of work before the clock slept
+        self.frame = array("d", bytes(8 * capacity))
+        self.work = array("d", bytes(8 * capacity))
+        self.written = 0
+        self.read = 0
+
+    def write(self, frame: float, work: float) -> None:
+        i = self.written % self.capacity
+        self.frame[i] = frame
+        self.work[i] = work
+        # published last, the reader never sees a half written slot
+        self.written += 1
+
+    def drain(self) -> Tuple[List[float], List[float], int]:
+        """returns (frame times, work times, dropped) since the last drain"""
+        end = self.written
+        start = max(self.read, end - self.capacity)
+        dropped = start - self.read
+        self.read = end
+        frames = [self.frame[i % self.capacity] for i in range(start, end)]
+        works = [self.work[i % self.capacity] for i in range(start, end)]
+        return frames, works, dropped
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Telemetry:
+    """
+    Frame metrics for Prometheus. The game loop calls `record` once a frame,
+    everything else happens on a daemon thread every `interval` seconds:
+    frame time histograms and percentiles, ticks that went over the frame
+    budget, bandwidth from psutil and the latency the endpoint pool measured
+    for each server. The thread also imports prometheus_client and psutil
+    and starts the metrics server, so none of it delays the game's start.
+    """
+
+    def __init__(
+        self,
+        fps: int = 30,
+        port: int = 8000,
+        interval: float = 1,
+        endpoints: Optional[EndpointPool] = None,
+        capacity: int = 4096,
+    ) -> None:
+        self.budget = 1 / fps
+        self.port = port
+        self.interval = interval
+        self.endpoints = endpoints
+        self.ring = FrameRing(capacity)
+        # seconds from launch to the first presented frame, set by the game
+        self.first_frame: Optional[float] = None
+        self.thread = threading.Thread(
+            target=self.run, name="telemetry", daemon=True
+        )
+        self.stopped = threading.Event()
+
+    def record(self, frame_ms: int, work_ms: int) -> None:
+        """hot path, takes pygame Clock.get_time() and get_rawtime()"""
+        self.ring.write(frame_ms / 1000, work_ms / 1000)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def setup(self) -> None:
+        """creates the metrics and serves them, on the telemetry thread"""
+        from prometheus_client import (
+            Counter,
+            Gauge,
+            Histogram,
+            start_http_server,
+        )
+
+        self.frame_time = Histogram(
+            "flappybird_frame_seconds",
+            "Time between frames",
+            buckets=FRAME_BUCKETS,
+        )
+        self.work_time = Histogram(
+            "flappybird_frame_work_seconds",
+            "Time spent on a frame before the clock sleeps",
+            buckets=FRAME_BUCKETS,
+        )
+        self.over_budget = Counter(
+            "flappybird_ticks_over_budget",
+            "Frames whose work took longer than the frame budget",
+        )
+        self.dropped = Counter(
+            "flappybird_telemetry_dropped_samples",
+            "Frame samples overwritten before the collector read them",
+        )
+        self.frame_quantiles = Gauge(
+            "flappybird_frame_seconds_quantile",
+            "Frame time percentiles over the last collection interval",
+            ["quantile"],
+        )
+        self.fps_metric = Gauge(
+            "flappybird_fps", "Frames Per Second of FlappyBird"
+        )
+        self.network_latency_metric = Gauge(
+            "flappybird_network_latency",
+            "Network Latency in milliseconds",
+            ["endpoint"],
+        )
+        self.bandwidth_metric = Gauge(
+            "flappybird_bandwidth_usage", "Bandwidth Usage in KB/s"
+        )
+        self.first_frame_metric = Gauge(
+            "flappybird_time_to_first_frame_seconds",
+            "Seconds from launch to the first presented frame",
+        )
+        if self.first_frame is not None:
+            self.first_frame_metric.set(self.first_frame)
+
+        # serves the metrics on http://localhost:8000/metrics by default
+        start_http_server(self.port)
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+    def run(self) -> None:
+        import psutil
+
+        self.setup()
+        net_io = psutil.net_io_counters()
+        last_bytes = net_io.bytes_recv + net_io.bytes_sent
+        last_collect = time.monotonic()
+
+        while not self.stopped.wait(self.interval):
+            self.collect()
+
+            now = time.monotonic()
+            net_io = psutil.net_io_counters()
+            total_bytes = net_io.bytes_recv + net_io.bytes_sent
+            kb_per_s = (total_bytes - last_bytes) / 1024 / (now - last_collect)
+            self.bandwidth_metric.set(kb_per_s)
+            last_bytes, last_collect = total_bytes, now
+
+            if self.endpoints is not None:
+                for url, latency in self.endpoints.latencies().items():
+                    if latency is not None:
+                        self.network_latency_metric.labels(url).set(
+                            latency * 1000
+                        )
+
+    def collect(self) -> None:
+        frames, works, dropped = self.ring.drain()
+        if dropped:
+            self.dropped.inc(dropped)
+        if not frames:
+            return
+        for frame, work in zip(frames, works):
+            self.frame_time.observe(frame)
+            self.work_time.observe(work)
+        self.over_budget.inc(sum(work > self.budget for work in works))
+
+        ordered = sorted(frames)
+        for q in (0.5, 0.95, 0.99):
+            self.frame_quantiles.labels(str(q)).set(percentile(ordered, q))
+        self.fps_metric.set(len(frames) / (sum(frames) or 1))
@@ -0,0 +1,47 @@
+import time
+
+
+class FixedTimestep:
+    """
+    Accumulates real time and hands it out in fixed physics steps, so the
+    game runs at `rate` steps a second however fast frames render:
+
+        for _ in range(timestep.advance()):
+            entity.step()
+        entity.render(timestep.alpha)
+
+    `alpha` is how far the current time is between the last two steps, for
+    drawing in between. A frame that took too long is caught up with
+    several steps, but at most `max_steps`, beyond that time is dropped and
+    the game slows down instead of stalling on catch-up.
+    """
+
+    def __init__(self, rate: int, max_steps: int = 5) -> None:
+        self.dt = 1 / rate
+        self.max_steps = max_steps
+        self.dropped = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """starts counting from now, e.g. after a blocking screen"""
+        self.last = time.perf_counter()
+        self.accumulator = 0.0
+
+    def advance(self) -> int:
+        """returns how many steps to run for the time since the last call"""
+        now = time.perf_counter()
+        self.accumulator += now - self.last
+        self.last = now
+
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            self.dropped += steps - self.max_steps
+            steps = self.max_steps
+            self.accumulator %= self.dt
+        else:
+            self.accumulator -= steps * self.dt
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        return min(self.accumulator / self.dt, 1.0)
@@ -1,9 +1,9 @@
 from functools import wraps
-from typing import List
+from typing import Dict
 
 import pygame
 
-HitMaskType = List[List[bool]]
+HitMaskType = pygame.mask.Mask
 
 
 def clamp(n: float, minn: float, maxn: float) -> float:
@@ -21,23 +21,31 @@ def memoize(func):
             cache[key] = func(*args, **kwargs)
         return cache[key]
 
+    wrapper.cache = cache
     return wrapper
 
 
+def build_hit_mask(image: pygame.Surface) -> HitMaskType:
+    """returns a bit-packed hit mask of every pixel with a non-zero alpha."""
+    return pygame.mask.from_surface(image, 0)
+
+
+# precomputed hit masks by surface, checked before building one
+primed_hit_masks: Dict[pygame.Surface, HitMaskType] = {}
+
+
 @memoize
 def get_hit_mask(image: pygame.Surface) -> HitMaskType:
-    """returns a hit mask using an image's alpha."""
-    return list(
-        (
-            list(
-                (
-                    bool(image.get_at((x, y))[3])
-                    for y in range(image.get_height())
-                )
-            )
-            for x in range(image.get_width())
-        )
-    )
+    """returns the hit mask of an image, built once per surface."""
+    hit_mask = primed_hit_masks.get(image)
+    if hit_mask is None:
+        hit_mask = build_hit_mask(image)
+    return hit_mask
+
+
+def prime_hit_mask(image: pygame.Surface, hit_mask: HitMaskType) -> None:
+    """registers a precomputed hit mask for an image, see SpriteBundle."""
+    primed_hit_masks[image] = hit_mask
 
 
 def pixel_collision(
@@ -47,16 +55,9 @@ def pixel_collision(
     hitmask2: HitMaskType,
 ):
     """Checks if two objects collide and not just their rects"""
-    rect = rect1.clip(rect2)
-
-    if rect.width == 0 or rect.height == 0:
+    if not rect1.colliderect(rect2):
         return False
 
-    x1, y1 = rect.x - rect1.x, rect.y - rect1.y
-    x2, y2 = rect.x - rect2.x, rect.y - rect2.y
-
-    for x in range(rect.width):
-        for y in range(rect.height):
-            if hitmask1[x1 + x][y1 + y] and hitmask2[x2 + x][y2 + y]:
-                return True
-    return False
+    # masks cover their rects, so overlap only ever tests the clipped area
+    offset = (rect2.x - rect1.x, rect2.y - rect1.y)
+    return hitmask1.overlap(hitmask2, offset) is not None
@@ -0,0 +1,70 @@
+"""
+Verifies submitted scores by replaying them on a process pool, see
+ReplayVerifier. Takes score spools (a JSON record per line, as the
+ScoreSubmitter writes them) and Recording files, and prints a verdict for
+each score that was rejected:
+
+    python -m src.verify ~/.cache/flappybird/scores.spool recordings/*.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from .services.verifier import ReplayVerifier
+
+
+def load(path: str) -> list:
+    """(name, replay, claimed score) for every submission in a file"""
+    with open(path) as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        records = [json.loads(line) for line in text.splitlines() if line]
+        return [
+            (f"{path}:{record['id']}", record.get("replay"), record["score"])
+            for record in records
+        ]
+    if isinstance(data, dict) and "version" in data:
+        return [(path, data, data["score"])]
+    return [(f"{path}:{data['id']}", data.get("replay"), data["score"])]
+
+
+async def main(args) -> int:
+    submissions = [s for path in args.files for s in load(path)] * args.repeat
+    verifier = ReplayVerifier(args.workers, args.batch_size)
+    verifier.start()
+
+    async def check(name, replay, claimed):
+        verdict = await verifier.verify(replay or {}, claimed)
+        if not verdict.accepted:
+            print(
+                f"{name}: rejected, {verdict.reason}, claimed"
+                f" {verdict.claimed} replayed {verdict.score}"
+            )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(check(*s) for s in submissions))
+    elapsed = time.perf_counter() - start
+    stats = verifier.stats()
+    await verifier.stop()
+
+    print(
+        f"{stats['accepted']}/{stats['verified']} accepted in {elapsed:.2f} s"
+        f", {stats['verified'] / elapsed:.0f} replays/s"
+    )
+    return 1 if stats["accepted"] < stats["verified"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--workers", type=int, help="default one per core")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="verify everything N times"
+    )
+    sys.exit(asyncio.run(main(parser.parse_args())))